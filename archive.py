@@ -0,0 +1,140 @@
+import mmap
+import os
+import struct
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+import metrics
+
+class ArchiveConfig:
+    MAX_OPEN_ARCHIVES = 8
+    USE_MMAP = True
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+LOCAL_HEADER = struct.Struct(zipfile.structFileHeader)
+
+class OpenArchive:
+    """An open CBZ with its sorted page index, read directly from an mmap for stored members."""
+    def __init__(self, cbz_filename, stat, use_mmap=ArchiveConfig.USE_MMAP):
+        self.cbz_filename = cbz_filename
+        self.stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.file = open(cbz_filename, 'rb')
+        try:
+            self.zip = zipfile.ZipFile(self.file)
+            self.pages = sorted(name for name in self.zip.namelist() if name.lower().endswith(IMAGE_EXTENSIONS))
+            self.infos = {name: self.zip.getinfo(name) for name in self.pages}
+            has_stored = any(info.compress_type == zipfile.ZIP_STORED for info in self.infos.values())
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap and has_stored and stat.st_size else None
+        except Exception:
+            self.file.close()
+            raise
+        self._data_offsets = {}
+        self.users = 0
+        self.evicted = False
+
+    def read(self, image_name, size=None):
+        """Return a page's bytes, or only its first `size` bytes."""
+        info = self.infos[image_name]
+        with metrics.span("zip.read", partial=size is not None):
+            if self.mmap is not None and info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+                offset = self._data_offset(info)
+                if size is not None:
+                    return self.mmap[offset:offset + min(size, info.file_size)]
+                data = self.mmap[offset:offset + info.file_size]
+                if zlib.crc32(data) != info.CRC:
+                    raise zipfile.BadZipFile(f"Bad CRC-32 for file {image_name!r}")
+                return data
+            with self.zip.open(info) as file:
+                return file.read(size) if size is not None else file.read()
+
+    def read_page(self, page_number):
+        return self.read(self.pages[page_number])
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+        self.zip.close()
+        self.file.close()
+
+    def _data_offset(self, info):
+        offset = self._data_offsets.get(info.filename)
+        if offset is None:
+            header = LOCAL_HEADER.unpack(self.mmap[info.header_offset:info.header_offset + LOCAL_HEADER.size])
+            if header[0] != zipfile.stringFileHeader:
+                raise zipfile.BadZipFile(f"Bad local header for file {info.filename!r}")
+            name_length, extra_length = header[-2], header[-1]
+            offset = info.header_offset + LOCAL_HEADER.size + name_length + extra_length
+            self._data_offsets[info.filename] = offset
+        return offset
+
+class ArchivePool:
+    """Keep recently used CBZ files open so a page turn costs a single member read."""
+    def __init__(self, max_open=ArchiveConfig.MAX_OPEN_ARCHIVES, use_mmap=ArchiveConfig.USE_MMAP):
+        self.max_open = max_open
+        self.use_mmap = use_mmap
+        self._archives = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, cbz_filename):
+        archive = self._acquire(cbz_filename)
+        try:
+            yield archive
+        finally:
+            self._release(archive)
+
+    def page_names(self, cbz_filename):
+        with self.open(cbz_filename) as archive:
+            return list(archive.pages)
+
+    def read(self, cbz_filename, image_name, size=None):
+        with self.open(cbz_filename) as archive:
+            return archive.read(image_name, size)
+
+    def read_page(self, cbz_filename, page_number):
+        with self.open(cbz_filename) as archive:
+            return archive.read_page(page_number)
+
+    def discard(self, cbz_filename):
+        with self._lock:
+            archive = self._archives.pop(os.path.abspath(cbz_filename), None)
+            if archive is not None:
+                self._retire(archive)
+
+    def close_all(self):
+        with self._lock:
+            while self._archives:
+                self._retire(self._archives.popitem()[1])
+
+    def _acquire(self, cbz_filename):
+        key = os.path.abspath(cbz_filename)
+        stat = os.stat(key)
+        with self._lock:
+            archive = self._archives.get(key)
+            if archive is not None and archive.stat_key != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                del self._archives[key]
+                self._retire(archive)
+                archive = None
+            if archive is None:
+                archive = OpenArchive(key, stat, self.use_mmap)
+                self._archives[key] = archive
+                while len(self._archives) > self.max_open:
+                    self._retire(self._archives.popitem(last=False)[1])
+            self._archives.move_to_end(key)
+            archive.users += 1
+            return archive
+
+    def _release(self, archive):
+        with self._lock:
+            archive.users -= 1
+            if archive.evicted and archive.users == 0:
+                archive.close()
+
+    def _retire(self, archive):
+        archive.evicted = True
+        if archive.users == 0:
+            archive.close()
+
+ARCHIVES = ArchivePool()
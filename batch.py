@@ -0,0 +1,164 @@
+import concurrent.futures
+import sys
+import threading
+import time
+from network import fetch_search_results, fetch_chapters, process_chapter, crawl_listing
+from catalog import title_catalog
+from scheduler import Priority
+from blobstore import blob_store
+from library import library_index
+from transcode import transcoder
+from utils import clean_filename
+
+class TransferStats:
+    def __init__(self):
+        self.pages = 0
+        self.bytes = 0
+        self.chapters = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, pages, nbytes):
+        with self._lock:
+            self.pages += pages
+            self.bytes += nbytes
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"{self.chapters} chapter(s) downloaded, {self.skipped} already present, {self.failed} failed\n"
+            f"{self.pages} pages, {self.bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+            f"({self.pages / elapsed:.1f} pages/s, {self.bytes / 1e6 / elapsed:.2f} MB/s)"
+        )
+
+def parse_chapter_range(spec):
+    """Parse a spec like "1-500" or "1-10,15,20.5-30" into inclusive (start, end) bounds."""
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        try:
+            start = float(start) if start else float("-inf")
+            end = float(end) if end else (float("inf") if _ else start)
+        except ValueError:
+            raise ValueError(f"Invalid chapter range: {part!r}") from None
+        ranges.append((start, end))
+    if not ranges:
+        raise ValueError(f"Invalid chapter range: {spec!r}")
+    return ranges
+
+def select_chapters(chapters, ranges):
+    selected = []
+    for chapter in chapters:
+        try:
+            number = float(chapter["number"])
+        except ValueError:
+            continue
+        if any(start <= number <= end for start, end in ranges):
+            selected.append(chapter)
+    return selected
+
+def resolve_series(query):
+    manga_data, error = fetch_search_results(query)
+    if error:
+        return None, error
+    if not manga_data:
+        return None, f"No manga found for {query!r}."
+    for manga in manga_data:
+        if manga["title"].lower() == query.lower():
+            return manga, None
+    return manga_data[0], None
+
+def download_chapters(series_name, chapters, cookies, jobs, stats):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        future_to_chapter = {
+            executor.submit(process_chapter, chapter, series_name, cookies, None, Priority.BACKGROUND, stats): chapter
+            for chapter in chapters
+        }
+        try:
+            for future in concurrent.futures.as_completed(future_to_chapter):
+                chapter = future_to_chapter[future]
+                try:
+                    cbz_filename, message = future.result()
+                except Exception as e:
+                    cbz_filename, message = None, str(e)
+                if cbz_filename and message.startswith("Using existing file"):
+                    stats.skipped += 1
+                    print(f"Chapter {chapter['number']}: already downloaded")
+                elif cbz_filename:
+                    stats.chapters += 1
+                    print(f"Chapter {chapter['number']}: {cbz_filename}" + (f" ({message})" if message else ""))
+                else:
+                    stats.failed += 1
+                    print(f"Chapter {chapter['number']}: {message}")
+        except KeyboardInterrupt:
+            for future in future_to_chapter:
+                future.cancel()
+            print("Interrupted; finished chapters are kept and the rest resume on the next run.")
+            raise
+
+def run_catalog(args):
+    catalog = title_catalog()
+    if args.crawl:
+        found = crawl_listing(args.crawl, lambda page, found: print(f"Listing page {page}: {found} series so far"))
+        print(f"Catalog holds {len(catalog)} series after crawling {found} listing entries.")
+    if args.query:
+        matches = catalog.search(args.query)
+        for score, manga in matches:
+            print(f"{score:.2f}  {manga['title']}  {manga['url']}")
+        if not catalog.is_confident(matches):
+            print("No confident local match; an interactive search would query the site.")
+    return 0
+
+def run_blobs(args):
+    store = blob_store()
+    if store is None:
+        print("The blob store is disabled.")
+        return 1
+    if args.prune:
+        blobs, size = store.prune(library_index().root)
+        print(f"Pruned {blobs} blobs ({size / 1e6:.1f} MB) no chapter or download manifest uses.")
+    print(store.summary())
+    return 0
+
+def run_download(args):
+    try:
+        ranges = parse_chapter_range(args.chapters) if args.chapters else None
+    except ValueError as e:
+        print(f"mangareader download: error: {e} (expected e.g. 1-500 or 1-10,15)", file=sys.stderr)
+        return 2
+    manga, error = resolve_series(args.series)
+    if error:
+        print(error)
+        return 1
+    series_name = clean_filename(manga["title"])
+    print(f"Series: {manga['title']} ({manga['url']})")
+
+    chapters, cookies, error = fetch_chapters(manga["url"], series_name)
+    if error:
+        print(error)
+        return 1
+    if ranges:
+        chapters = select_chapters(chapters, ranges)
+    if not chapters:
+        print("No chapters match the requested range.")
+        return 1
+
+    jobs = max(1, args.jobs)
+    print(f"Downloading {len(chapters)} chapter(s) with {jobs} job(s)...")
+    stats = TransferStats()
+    try:
+        download_chapters(series_name, chapters, cookies, jobs, stats)
+    finally:
+        print(stats.summary())
+        store = blob_store()
+        if store:
+            print(store.summary())
+        pipeline = transcoder()
+        if pipeline:
+            print(pipeline.summary())
+    return 1 if stats.failed else 0
@@ -0,0 +1,317 @@
+import argparse
+import concurrent.futures
+import io
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from data import CompressionPolicy, StoreAllPolicy, DeflateAllPolicy, create_cbz
+from parsing import available_backends, extract_image_urls, extract_chapter_links, extract_search_results
+
+COMPRESSION_POLICIES = {
+    "store": StoreAllPolicy(),
+    "auto": CompressionPolicy(),
+    "deflate": DeflateAllPolicy(),
+}
+
+def read_pages(cbz_filename):
+    with zipfile.ZipFile(cbz_filename, 'r') as zf:
+        return [(name, zf.read(name)) for name in sorted(zf.namelist())]
+
+def measure_policy(pages, policy):
+    buffer = io.BytesIO()
+    start = time.process_time()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for img_name, img_content in pages:
+            compress_type, compresslevel = policy.choose(img_name, img_content)
+            zf.writestr(img_name, img_content, compress_type=compress_type, compresslevel=compresslevel)
+    write_seconds = time.process_time() - start
+
+    buffer.seek(0)
+    start = time.process_time()
+    with zipfile.ZipFile(buffer, 'r') as zf:
+        for img_name, _ in pages:
+            zf.read(img_name)
+    read_seconds = time.process_time() - start
+    return buffer.getbuffer().nbytes, write_seconds, read_seconds
+
+def run_compression(args):
+    totals = {name: [0, 0.0, 0.0] for name in COMPRESSION_POLICIES}
+    for cbz_filename in args.cbz_files:
+        pages = read_pages(cbz_filename)
+        print(f"{os.path.basename(cbz_filename)} ({len(pages)} pages)")
+        baseline = None
+        for name, policy in COMPRESSION_POLICIES.items():
+            size, write_seconds, read_seconds = measure_policy(pages, policy)
+            baseline = size if baseline is None else baseline
+            totals[name][0] += size
+            totals[name][1] += write_seconds
+            totals[name][2] += read_seconds
+            print(f"  {name:<8} {size:>12} bytes  saved {baseline - size:>10}  "
+                  f"write {write_seconds:.3f}s cpu  read {read_seconds:.3f}s cpu")
+
+    chapters = len(args.cbz_files)
+    print(f"Per chapter average over {chapters} chapter(s):")
+    store_bytes = totals["store"][0]
+    for name, (size, write_seconds, read_seconds) in totals.items():
+        print(f"  {name:<8} saved {(store_bytes - size) / chapters:>12.0f} bytes  "
+              f"write {write_seconds / chapters:.3f}s cpu  read {read_seconds / chapters:.3f}s cpu")
+
+EXTRACTORS = {
+    "search": extract_search_results,
+    "series": extract_chapter_links,
+    "chapter": extract_image_urls,
+}
+
+def fixture_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".html", ".htm")):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+def run_parsers(args):
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)} (default: {backends[0]})")
+    for fixture in fixture_files(args.fixtures):
+        with open(fixture, "r", encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.basename(fixture)
+        kinds = [kind for kind in EXTRACTORS if name.startswith(kind)] or list(EXTRACTORS)
+        for kind in kinds:
+            extractor = EXTRACTORS[kind]
+            print(f"{name} [{kind}] {len(html)} bytes")
+            reference = None
+            for backend in backends:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    result = extractor(html, backend)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                reference = result if reference is None else reference
+                mismatch = "" if result == reference else "  (differs from first backend!)"
+                print(f"  {backend:<12} {elapsed * 1000:>9.2f} ms  {len(result)} items{mismatch}")
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class LatencyRecorder:
+    """Response hook collecting time-to-headers for every request made through a session."""
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def __call__(self, response, *args, **kwargs):
+        with self._lock:
+            self.samples.append(response.elapsed.total_seconds())
+
+class FirstPageTimer:
+    """Stream sink for process_chapter noting when a chapter's first page was written."""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_page_s = None
+
+    def begin(self, total):
+        pass
+
+    def page(self, index, img_name, content):
+        if self.first_page_s is None:
+            self.first_page_s = time.perf_counter() - self.start
+
+def run_site(args):
+    # Resolve before measure_site changes directory, or a relative path would point into the temp directory.
+    fixtures = os.path.abspath(args.fixtures) if args.fixtures else None
+    if fixtures and not os.path.isdir(fixtures):
+        print(f"Fixture directory not found: {args.fixtures}")
+        return 1
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="mangareader-bench-")
+    try:
+        return measure_site(args, workdir, fixtures)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def measure_site(args, workdir, fixtures):
+    """Run the pipeline against a mock site with workdir as the library; run_site removes it afterwards."""
+    from mocksite import MockSite
+
+    os.chdir(workdir)
+    from library import LibraryConfig
+    from blobstore import BlobStoreConfig
+    LibraryConfig.ROOT = workdir
+    BlobStoreConfig.ENABLED = False
+    import network
+
+    latencies = LatencyRecorder()
+    network.SESSION.hooks["response"].append(latencies)
+    with MockSite(args.latency, args.bandwidth * 1024 * 1024, args.chapters, args.pages, args.image_kb * 1024, args.seed, fixtures) as site:
+        network.CONFIG.BASE_URL = f"{site.base_url}/manga/"
+        results = {"latency_ms": args.latency * 1000, "bandwidth_mb_s": args.bandwidth, "chapters": args.chapters, "pages_per_chapter": args.pages}
+
+        start = time.perf_counter()
+        manga_data, error = network.fetch_search_results("mock series")
+        if error or not manga_data:
+            print(error or "Mock search returned no results")
+            return 1
+        chapters, cookies, error = network.fetch_chapters(manga_data[0]["url"], "Mock_Series")
+        if error:
+            print(error)
+            return 1
+        results["lookup_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        image_urls = [network.get_image_urls(chapter["url"], cookies)[0] for chapter in chapters]
+        results["get_image_urls_s"] = time.perf_counter() - start
+        results["image_urls"] = sum(len(urls) for urls in image_urls)
+
+        start = time.perf_counter()
+        timers = [FirstPageTimer() for _ in chapters]
+
+        def process(chapter, timer):
+            timer.start = time.perf_counter()
+            return network.process_chapter(chapter, "Mock_Series", cookies, stream=timer)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            outcomes = list(executor.map(process, chapters, timers))
+        elapsed = time.perf_counter() - start
+        written = [cbz for cbz, _ in outcomes if cbz]
+        pages = page_bytes = 0
+        for cbz in written:
+            with zipfile.ZipFile(cbz) as zf:
+                infos = zf.infolist()
+            pages += len(infos)
+            page_bytes += sum(info.file_size for info in infos)
+        results.update({
+            "process_chapter_s": elapsed,
+            "chapters_written": len(written),
+            "pages": pages,
+            "pages_per_s": pages / elapsed,
+            "mb_per_s": page_bytes / 1e6 / elapsed,
+            "first_page_p50_s": percentile([timer.first_page_s for timer in timers if timer.first_page_s is not None], 50),
+        })
+
+    if written:
+        chapter_pages = read_pages(written[0])
+        start = time.perf_counter()
+        create_cbz(chapter_pages, os.path.join(workdir, "create_cbz_bench.cbz"))
+        elapsed = time.perf_counter() - start
+        results["create_cbz_pages_per_s"] = len(chapter_pages) / elapsed
+
+    results.update({
+        "requests": len(latencies.samples),
+        "request_p50_ms": percentile(latencies.samples, 50) * 1000,
+        "request_p99_ms": percentile(latencies.samples, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    network.SCHEDULER.shutdown()
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"Mock site: {args.chapters} chapter(s) x {args.pages} pages of {args.image_kb} KB, "
+          f"{args.latency * 1000:.0f} ms latency, {'unlimited' if not args.bandwidth else f'{args.bandwidth} MB/s'} per response")
+    print(f"  search + series     {results['lookup_s']:.3f}s")
+    print(f"  get_image_urls      {results['get_image_urls_s']:.3f}s for {results['image_urls']} URLs")
+    print(f"  process_chapter     {results['process_chapter_s']:.3f}s, {results['chapters_written']} chapter(s), "
+          f"{results['pages_per_s']:.1f} pages/s, {results['mb_per_s']:.2f} MB/s")
+    print(f"  first page written  {results['first_page_p50_s']:.3f}s p50 (what a streaming viewer waits for)")
+    if "create_cbz_pages_per_s" in results:
+        print(f"  create_cbz          {results['create_cbz_pages_per_s']:.1f} pages/s")
+    print(f"  requests            {results['requests']}, p50 {results['request_p50_ms']:.1f} ms, p99 {results['request_p99_ms']:.1f} ms")
+    print(f"  peak RSS            {results['peak_rss_mb']:.1f} MB")
+
+STARTUP_TARGETS = {
+    "menu": "import mangareader, ui; ui.MenuOptions()",
+    "download": "import mangareader, batch",
+    "check-updates": "import mangareader, updates",
+    "viewer": "import viewer",
+}
+HEAVY_MODULES = ("PyQt5", "tkinter", "bs4", "lxml", "requests", "PIL")
+
+def parse_importtime(stderr):
+    """Return (top-level import microseconds, [(cumulative_us, module)]) from -X importtime output."""
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = int(cumulative)
+        if not name.startswith("  "):
+            total += cumulative
+        modules.append((cumulative, name.strip()))
+    return total, modules
+
+def run_startup(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    for target in args.targets or list(STARTUP_TARGETS):
+        code = f"{STARTUP_TARGETS[target]}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        walls, imports = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=here, capture_output=True, text=True)
+            walls.append(time.perf_counter() - start)
+            total, modules = parse_importtime(result.stderr)
+            imports.append(total)
+        if result.returncode != 0:
+            print(f"{target:<14} failed: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        heavy = result.stdout.strip() or "none"
+        print(f"{target:<14} {statistics.median(walls) * 1000:>7.1f} ms wall  {statistics.median(imports) / 1000:>7.1f} ms imports  heavy: {heavy}")
+        for cumulative, name in sorted(modules, reverse=True)[:args.top]:
+            print(f"    {cumulative / 1000:>7.1f} ms  {name}")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="MangaReader benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compression = subparsers.add_parser("compression", help="Compare CBZ compression policies on existing chapters")
+    compression.add_argument("cbz_files", nargs="+")
+    compression.set_defaults(func=run_compression)
+
+    parsers = subparsers.add_parser("parsers", help="Compare HTML parser backends on saved pages")
+    parsers.add_argument("fixtures", nargs="+", help="HTML files or directories; names starting with search/series/chapter select the extractor")
+    parsers.add_argument("--repeat", type=int, default=5)
+    parsers.set_defaults(func=run_parsers)
+
+    site = subparsers.add_parser("site", help="Download chapters end to end from a local mock site")
+    site.add_argument("--chapters", type=int, default=5)
+    site.add_argument("--pages", type=int, default=20, help="Pages per chapter")
+    site.add_argument("--image-kb", type=int, default=300, help="Size of each synthetic page")
+    site.add_argument("--latency", type=float, default=0.05, help="Seconds added before every response")
+    site.add_argument("--bandwidth", type=float, default=0, help="Per-response throughput cap in MB/s (0 = unlimited)")
+    site.add_argument("--jobs", type=int, default=1, help="Chapters to process concurrently")
+    site.add_argument("--seed", type=int, default=0)
+    site.add_argument("--fixtures", help="Directory with recorded search.html, series.html and chapter.html")
+    site.add_argument("--json", action="store_true", help="Print one JSON object for regression tracking")
+    site.set_defaults(func=run_site)
+
+    startup = subparsers.add_parser("startup", help="Time interpreter start to menu and headless entry points with -X importtime")
+    startup.add_argument("--target", dest="targets", action="append", choices=list(STARTUP_TARGETS), help="Entry point to time; repeat for several (default: all)")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--top", type=int, default=5, help="Slowest imports to list per target")
+    startup.set_defaults(func=run_startup)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from library import library_index
+from manifest import ChapterManifest
+
+class BlobStoreConfig:
+    ENABLED = True
+    DIRECTORY = os.environ.get("MANGAREADER_BLOBS")
+    DIRECTORY_NAME = ".blobs"
+    # Every page also lives in its CBZ, so the store is a cache: least recently used blobs go past this size.
+    MAX_BYTES = 2 * 1024 ** 3
+    EVICT_TO = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES blobs(digest)
+) WITHOUT ROWID;
+"""
+
+class BlobStore:
+    """Content-addressed page store keyed by the SHA-256 of the image bytes."""
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = BlobStoreConfig.MAX_BYTES if max_bytes is None else max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(blobs)")}
+            if "last_used" not in columns:
+                self._conn.execute("ALTER TABLE blobs ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        self.stored_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        self.evicted_blobs = 0
+        self.reused_pages = 0
+        self.reused_bytes = 0
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def put(self, content, url=None):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                added = self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (digest, size, last_used) VALUES (?, ?, ?)", (digest, len(content), now)
+                ).rowcount
+                if added:
+                    self.stored_bytes += len(content)
+                else:
+                    self._conn.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (now, digest))
+                if url:
+                    self._conn.execute("INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)", (url, digest))
+            if self.max_bytes and self.stored_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * BlobStoreConfig.EVICT_TO))
+        return digest
+
+    def get(self, digest):
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def digest_for_url(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def get_by_url(self, url):
+        """Return the stored bytes for a page URL fetched before, so it need not be downloaded again."""
+        digest = self.digest_for_url(url)
+        content = self.get(digest) if digest else None
+        if content is not None:
+            with self._lock:
+                self.reused_pages += 1
+                self.reused_bytes += len(content)
+                with self._conn:
+                    self._conn.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (time.time(), digest))
+        return content
+
+    def prune(self, root):
+        """Drop blobs that no CBZ or download manifest under root contains; returns (blobs, bytes) removed.
+
+        Reads every page of every chapter to hash it, so this is a maintenance
+        step rather than something to run on each download.
+        """
+        referenced = set()
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.name.endswith(".cbz") and entry.is_file():
+                    try:
+                        with zipfile.ZipFile(entry.path) as zf:
+                            for name in zf.namelist():
+                                referenced.add(hashlib.sha256(zf.read(name)).hexdigest())
+                    except (zipfile.BadZipFile, OSError) as e:
+                        print(f"Skipping {entry.name}: {e}")
+                elif entry.name.endswith(".manifest"):
+                    manifest = ChapterManifest.load(entry.path)
+                    for page in (manifest.completed.values() if manifest else ()):
+                        referenced.add(page["sha256"])
+                        referenced.add(page.get("source_sha256"))
+        with self._lock:
+            unused = [(digest, size) for digest, size in self._conn.execute("SELECT digest, size FROM blobs") if digest not in referenced]
+            self._remove(unused)
+        return len(unused), sum(size for _, size in unused)
+
+    def _evict(self, target_bytes):
+        """Remove least recently used blobs until the store is at most target_bytes; caller holds the lock."""
+        victims = []
+        remaining = self.stored_bytes
+        for digest, size in self._conn.execute("SELECT digest, size FROM blobs ORDER BY last_used"):
+            if remaining <= target_bytes:
+                break
+            victims.append((digest, size))
+            remaining -= size
+        self._remove(victims)
+        self.evicted_blobs += len(victims)
+
+    def _remove(self, blobs):
+        with self._conn:
+            self._conn.executemany("DELETE FROM urls WHERE digest = ?", [(digest,) for digest, _ in blobs])
+            self._conn.executemany("DELETE FROM blobs WHERE digest = ?", [(digest,) for digest, _ in blobs])
+        for digest, size in blobs:
+            self.stored_bytes -= size
+            try:
+                os.remove(self.path(digest))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            blobs, stored_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            pages, logical_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(blobs.size), 0) FROM urls JOIN blobs ON urls.digest = blobs.digest"
+            ).fetchone()
+        return {
+            "blobs": blobs,
+            "pages": pages,
+            "stored_bytes": stored_bytes,
+            "logical_bytes": logical_bytes,
+            "max_bytes": self.max_bytes,
+            "dedup_bytes": max(logical_bytes - stored_bytes, 0),
+            "dedup_ratio": logical_bytes / stored_bytes if stored_bytes else 1.0,
+            "evicted_blobs": self.evicted_blobs,
+            "reused_pages": self.reused_pages,
+            "reused_bytes": self.reused_bytes,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        cap = f"{stats['max_bytes'] / 1e6:.0f} MB cap" if stats["max_bytes"] else "no cap"
+        return (
+            f"Blob store: {stats['blobs']} blobs using {stats['stored_bytes'] / 1e6:.1f} MB on disk ({cap}, in addition to the CBZs) "
+            f"for {stats['pages']} pages, {stats['dedup_bytes'] / 1e6:.1f} MB of duplicate pages stored once, "
+            f"{stats['evicted_blobs']} evicted, {stats['reused_pages']} pages "
+            f"({stats['reused_bytes'] / 1e6:.1f} MB) reused instead of downloaded"
+        )
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+def blob_store():
+    """Return the shared blob store, or None when BlobStoreConfig.ENABLED is off."""
+    global _STORE
+    if not BlobStoreConfig.ENABLED:
+        return None
+    with _STORE_LOCK:
+        if _STORE is None:
+            directory = BlobStoreConfig.DIRECTORY or os.path.join(library_index().root, BlobStoreConfig.DIRECTORY_NAME)
+            _STORE = BlobStore(directory)
+        return _STORE
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+class CacheConfig:
+    DIRECTORY = os.path.join(".cache", "http")
+    MAX_BYTES = 64 * 1024 * 1024
+    TTLS = {
+        "search": 15 * 60,
+        "series": 30 * 60,
+        "chapter": 7 * 24 * 60 * 60,
+    }
+    DEFAULT_TTL = 5 * 60
+
+class CachedResponse:
+    """Minimal stand-in for a requests.Response served from the on-disk cache."""
+    def __init__(self, url, text, cookies):
+        self.url = url
+        self.status_code = 200
+        self.text = text
+        self.cookies = cookies
+        self.from_cache = True
+
+    def raise_for_status(self):
+        pass
+
+class HttpCache:
+    """URL-keyed page cache with per-page-type TTLs, conditional revalidation and LRU eviction."""
+    def __init__(self, directory=CacheConfig.DIRECTORY, max_bytes=CacheConfig.MAX_BYTES, ttls=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(CacheConfig.TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def get(self, session, url, page_type, headers=None, cookies=None, timeout=10):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        entry = self._load(key)
+        now = time.time()
+        if entry and now - entry["stored"] < self.ttls.get(page_type, CacheConfig.DEFAULT_TTL):
+            cached = self._hit(key, entry, url)
+            if cached is not None:
+                return cached
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = session.get(url, headers=request_headers, cookies=cookies, timeout=timeout)
+        if response.status_code == 304 and entry:
+            entry["stored"] = now
+            self._write_meta(key, entry)
+            cached = self._hit(key, entry, url)
+            if cached is not None:
+                return cached
+            response = session.get(url, headers=headers, cookies=cookies, timeout=timeout)
+        if response.status_code == 200:
+            self._store(key, url, page_type, response, now)
+        return response
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key[:2], key)
+        return f"{base}.json", f"{base}.html"
+
+    def _load(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry if os.path.exists(body_path) else None
+
+    def _hit(self, key, entry, url):
+        _, body_path = self._paths(key)
+        try:
+            with open(body_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(body_path)
+        except FileNotFoundError:
+            return None
+        return CachedResponse(url, text, entry.get("cookies", {}))
+
+    def _write_meta(self, key, entry):
+        meta_path, _ = self._paths(key)
+        temp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, meta_path)
+
+    def _store(self, key, url, page_type, response, now):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        body = response.text.encode("utf-8")
+        with self._lock:
+            total = self._current_total()
+            previous = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            temp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(body)
+            os.replace(temp_path, body_path)
+            self._write_meta(key, {
+                "url": url,
+                "page_type": page_type,
+                "stored": now,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "cookies": {cookie.name: cookie.value for cookie in response.cookies},
+            })
+            self._total_bytes = total + len(body) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _current_total(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".html"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for body_path, size, _ in entries:
+            if total <= target:
+                break
+            for path in (body_path, body_path[:-len(".html")] + ".json"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self._total_bytes = total
@@ -0,0 +1,124 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+class CatalogConfig:
+    DATABASE = "catalog.db"
+    CONFIDENT_SCORE = 0.7
+    MIN_SCORE = 0.2
+    # A word-prefix hit starts here and reaches CONFIDENT_SCORE only once the query covers 40% of the title.
+    PREFIX_SCORE = 0.5
+    SUGGESTIONS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    status TEXT,
+    latest_chapter_number TEXT,
+    latest_chapter_text TEXT,
+    update_time TEXT,
+    seen_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+FIELDS = ("url", "title", "status", "latest_chapter_number", "latest_chapter_text", "update_time")
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+def normalize_title(title):
+    return NON_ALPHANUMERIC.sub(" ", title.lower()).strip()
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleCatalog:
+    """Series titles seen in search results or listing crawls, with an in-memory trigram index."""
+    def __init__(self, path=CatalogConfig.DATABASE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        self._entries = {}
+        self._grams = {}
+        self._index = {}
+        for row in self._conn.execute(f"SELECT {', '.join(FIELDS)} FROM titles"):
+            self._remember(dict(zip(FIELDS, row)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, manga_data):
+        """Upsert search or listing results so later searches can be answered locally."""
+        entries = [
+            {field: manga.get(field) for field in FIELDS}
+            for manga in manga_data
+            if manga.get("url") and manga["url"] != "No URL" and manga.get("title")
+        ]
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO titles ({', '.join(FIELDS)}, seen_at) VALUES ({', '.join('?' * (len(FIELDS) + 1))})",
+                    [tuple(entry[field] for field in FIELDS) + (now,) for entry in entries],
+                )
+            for entry in entries:
+                self._remember(entry)
+
+    def search(self, query, limit=CatalogConfig.SUGGESTIONS):
+        """Return up to limit (score, entry) pairs, best first; scores run from 0 to 1."""
+        query = normalize_title(query)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        with self._lock:
+            shared = Counter()
+            for gram in query_grams:
+                for url in self._index.get(gram, ()):
+                    shared[url] += 1
+            scored = []
+            for url, count in shared.items():
+                normalized, grams = self._grams[url]
+                score = 2 * count / (len(query_grams) + len(grams))
+                if len(query) >= 3 and f" {normalized}".find(f" {query}") >= 0:
+                    # Typing the start of a word in a long title should rank it high, but a short
+                    # generic word ("the", "one") must not skip the online search.
+                    coverage = len(query) / len(normalized)
+                    score = max(score, CatalogConfig.PREFIX_SCORE + (1 - CatalogConfig.PREFIX_SCORE) * coverage)
+                if score >= CatalogConfig.MIN_SCORE:
+                    scored.append((score, dict(self._entries[url])))
+        scored.sort(key=lambda item: (-item[0], item[1]["title"]))
+        return scored[:limit]
+
+    def is_confident(self, matches):
+        return bool(matches) and matches[0][0] >= CatalogConfig.CONFIDENT_SCORE
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _remember(self, entry):
+        url = entry["url"]
+        _, old_grams = self._grams.pop(url, (None, ()))
+        for gram in old_grams:
+            self._index[gram].discard(url)
+        normalized = normalize_title(entry["title"])
+        grams = trigrams(normalized)
+        self._entries[url] = entry
+        self._grams[url] = (normalized, grams)
+        for gram in grams:
+            self._index.setdefault(gram, set()).add(url)
+
+_CATALOG = None
+_CATALOG_LOCK = threading.Lock()
+
+def title_catalog():
+    global _CATALOG
+    with _CATALOG_LOCK:
+        if _CATALOG is None:
+            _CATALOG = TitleCatalog()
+        return _CATALOG
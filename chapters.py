@@ -0,0 +1,72 @@
+import re
+
+UNKNOWN_NUMBER = "Unknown"
+CHAPTER_URL_PATTERN = re.compile(r'chapter[-_](\d+)(?:[-._](\d+)(?=[/?#]|$))?', re.IGNORECASE)
+CHAPTER_TEXT_PATTERN = re.compile(r'chapter\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+VOLUME_PATTERN = re.compile(r'vol(?:ume)?[-_.\s]*(\d+)', re.IGNORECASE)
+
+def parse_chapter_number(chapter_url, chapter_text=""):
+    """Chapter number as a string, keeping decimals: ".../chapter-12-5/" and "Chapter 12.5" both give "12.5"."""
+    match = CHAPTER_URL_PATTERN.search(chapter_url or "")
+    if match:
+        whole, fraction = match.groups()
+        return f"{int(whole)}.{fraction}" if fraction else str(int(whole))
+    match = CHAPTER_TEXT_PATTERN.search(chapter_text or "")
+    return match.group(1) if match else UNKNOWN_NUMBER
+
+def chapter_volume(chapter):
+    match = VOLUME_PATTERN.search(chapter.get("url") or "") or VOLUME_PATTERN.search(chapter.get("text") or "")
+    return int(match.group(1)) if match else None
+
+def chapter_number_value(number):
+    try:
+        return float(number)
+    except (TypeError, ValueError):
+        return 0.0
+
+def chapter_sort_keys(chapters):
+    """Sort keys for a chapter list, volume-major only when every chapter names its volume.
+
+    Series that restart numbering each volume sort correctly, while a few
+    volume-less chapters cannot push the whole list out of numeric order.
+    """
+    volumes = [chapter_volume(chapter) for chapter in chapters]
+    if volumes and all(volume is not None for volume in volumes):
+        return [(volume, chapter_number_value(chapter["number"])) for volume, chapter in zip(volumes, chapters)]
+    return [(chapter_number_value(chapter["number"]), volume or 0) for volume, chapter in zip(volumes, chapters)]
+
+def sort_chapters(chapters):
+    keys = chapter_sort_keys(chapters)
+    order = sorted(range(len(chapters)), key=keys.__getitem__)
+    return [chapters[i] for i in order]
+
+def build_chapter_list(links, known=None):
+    """Turn (text, url) links into chapter dicts sorted in reading order.
+
+    known is the previously sorted list for the same series; when the page
+    only gained chapters, the new ones are merged into the known order instead
+    of re-sorting everything.
+    """
+    known = known or []
+    known_by_url = {chapter["url"]: chapter for chapter in known}
+    kept_urls = set()
+    added = []
+    for chapter_text, chapter_url in links:
+        chapter = {"text": chapter_text, "url": chapter_url, "number": parse_chapter_number(chapter_url, chapter_text)}
+        previous = known_by_url.get(chapter_url)
+        if previous is not None and previous["text"] == chapter_text and previous["number"] == chapter["number"]:
+            kept_urls.add(chapter_url)
+        else:
+            added.append(chapter)
+
+    kept = [dict(chapter) for chapter in known if chapter["url"] in kept_urls]
+    if not added:
+        return kept
+    if len(kept) < len(known):
+        return sort_chapters(kept + added)
+    keys = chapter_sort_keys(kept + added)
+    kept_keys, added_keys = keys[:len(kept)], keys[len(kept):]
+    if kept_keys != sorted(kept_keys) or (kept_keys and min(added_keys) < kept_keys[-1]):
+        return sort_chapters(kept + added)
+    order = sorted(range(len(added)), key=added_keys.__getitem__)
+    return kept + [added[i] for i in order]
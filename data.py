@@ -1,41 +1,122 @@
-import json
 import os
+import threading
 import zipfile
+import metrics
+from progress import progress_store
+from library import library_index
 
 def load_read_list():
-    try:
-        with open("read_list.json", "r") as f:
-            data = json.load(f)
-            for series in list(data.keys()):
-                if isinstance(data[series], list):
-                    data[series] = {"read": data[series], "current": {"chapter": None, "page": None}}
-            return data
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    return progress_store().load()
 
 def save_read_list(read_list):
-    with open("read_list.json", "w") as f:
-        json.dump(read_list, f, indent=4)
+    progress_store().replace_all(read_list)
 
 def add_to_read_list(series_name, chapter_number):
-    read_list = load_read_list()
-    if series_name not in read_list:
-        read_list[series_name] = {"read": [], "current": {"chapter": None, "page": None}}
-    if chapter_number not in read_list[series_name]["read"]:
-        read_list[series_name]["read"].append(chapter_number)
-        read_list[series_name]["read"].sort()
-    save_read_list(read_list)
+    progress_store().mark_read(series_name, chapter_number)
 
 def update_current_position(series_name, chapter_number, page_number):
-    read_list = load_read_list()
-    if series_name not in read_list:
-        read_list[series_name] = {"read": [], "current": {"chapter": None, "page": None}}
-    read_list[series_name]["current"]["chapter"] = chapter_number
-    read_list[series_name]["current"]["page"] = str(page_number)
-    save_read_list(read_list)
-
-def create_cbz(image_data, cbz_filename):
-    with zipfile.ZipFile(cbz_filename, 'w', zipfile.ZIP_DEFLATED) as cbz:
+    progress_store().set_position(series_name, chapter_number, page_number)
+
+def flush_read_list():
+    progress_store().flush()
+
+def reload_read_list():
+    progress_store().reload()
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+)
+
+def sniff_image_format(content):
+    head = bytes(content[:64])
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "avif"
+    if head.lstrip().startswith((b"<svg", b"<?xml")):
+        return "svg"
+    return None
+
+class CompressionPolicy:
+    """Pick a zip compression method per page based on its sniffed image format."""
+    PRECOMPRESSED_FORMATS = frozenset({"jpeg", "png", "gif", "webp", "avif"})
+
+    def __init__(self, stored_formats=PRECOMPRESSED_FORMATS, compression=zipfile.ZIP_DEFLATED, compresslevel=6):
+        self.stored_formats = frozenset(stored_formats)
+        self.compression = compression
+        self.compresslevel = compresslevel
+
+    def choose(self, img_name, img_content):
+        if sniff_image_format(img_content) in self.stored_formats:
+            return zipfile.ZIP_STORED, None
+        return self.compression, self.compresslevel
+
+class StoreAllPolicy(CompressionPolicy):
+    def choose(self, img_name, img_content):
+        return zipfile.ZIP_STORED, None
+
+class DeflateAllPolicy(CompressionPolicy):
+    def choose(self, img_name, img_content):
+        return self.compression, self.compresslevel
+
+DEFAULT_COMPRESSION_POLICY = CompressionPolicy()
+
+class CbzWriter:
+    """Append pages to a CBZ as they arrive, committing it atomically on close."""
+    def __init__(self, cbz_filename, policy=None, resume=False):
+        self.cbz_filename = cbz_filename
+        self.policy = policy or DEFAULT_COMPRESSION_POLICY
+        self.temp_filename = f"{cbz_filename}.part"
+        self.page_count = 0
+        self.bytes_written = 0
+        self.existing = set()
+        self._lock = threading.Lock()
+        if resume and zipfile.is_zipfile(self.temp_filename):
+            self._zip = zipfile.ZipFile(self.temp_filename, 'a', zipfile.ZIP_DEFLATED)
+            self.existing = set(self._zip.namelist())
+            self.page_count = len(self.existing)
+        else:
+            self._zip = zipfile.ZipFile(self.temp_filename, 'w', zipfile.ZIP_DEFLATED)
+
+    def read_existing(self, img_name):
+        """Read a page kept from an earlier, unfinished attempt at this chapter."""
+        with self._lock:
+            return self._zip.read(img_name)
+
+    def add(self, img_name, img_content):
+        compress_type, compresslevel = self.policy.choose(img_name, img_content)
+        with self._lock, metrics.span("zip.write", bytes=len(img_content)):
+            self._zip.writestr(img_name, img_content, compress_type=compress_type, compresslevel=compresslevel)
+            self.page_count += 1
+            self.bytes_written += len(img_content)
+
+    def close(self, commit=True, keep_partial=False):
+        with self._lock:
+            if self._zip is None:
+                return
+            self._zip.close()
+            self._zip = None
+        if commit and self.page_count:
+            os.replace(self.temp_filename, self.cbz_filename)
+            library_index().record(self.cbz_filename)
+        elif not (keep_partial and self.page_count):
+            os.remove(self.temp_filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+def create_cbz(image_data, cbz_filename, policy=None):
+    with CbzWriter(cbz_filename, policy) as cbz:
         for img_name, img_content in image_data:
-            cbz.writestr(img_name, img_content)
-    return f"Created {cbz_filename}"
\ No newline at end of file
+            cbz.add(img_name, img_content)
+    return f"Created {cbz_filename}"
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zipfile
+
+class LibraryConfig:
+    ROOT = os.environ.get("MANGAREADER_LIBRARY", ".")
+    INDEX_NAME = "library.db"
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+CBZ_PATTERN = re.compile(r"^(?P<series>.+)_Chapter_(?P<number>[^_]+)\.cbz$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapters (
+    filename TEXT PRIMARY KEY,
+    series TEXT NOT NULL,
+    chapter TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+def chapter_filename(series_name, chapter_number):
+    return f"{series_name}_Chapter_{chapter_number}.cbz"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(LibraryConfig.HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class LibraryIndex:
+    """Index of downloaded chapters under the library root, answering lookups from memory."""
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or LibraryConfig.ROOT)
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.root, LibraryConfig.INDEX_NAME), check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        self._by_filename = {}
+        self._by_series = {}
+        for row in self._conn.execute("SELECT filename, series, chapter, pages, bytes, mtime_ns, sha256 FROM chapters"):
+            self._remember(self._entry(*row))
+
+    def chapter_path(self, series_name, chapter_number):
+        return os.path.join(self.root, chapter_filename(series_name, chapter_number))
+
+    def get(self, series_name, chapter_number):
+        return self._by_series.get(series_name, {}).get(str(chapter_number))
+
+    def chapters(self, series_name):
+        return dict(self._by_series.get(series_name, {}))
+
+    def series(self):
+        return sorted(self._by_series)
+
+    def record(self, cbz_path):
+        """Add or refresh the entry for a CBZ written under the library root."""
+        cbz_path = os.path.abspath(cbz_path)
+        filename = os.path.basename(cbz_path)
+        match = CBZ_PATTERN.match(filename)
+        if os.path.dirname(cbz_path) != self.root or not match:
+            return None
+        try:
+            stat = os.stat(cbz_path)
+            with zipfile.ZipFile(cbz_path, 'r') as zf:
+                pages = sum(1 for info in zf.infolist() if not info.is_dir())
+            sha256 = file_sha256(cbz_path)
+        except (OSError, zipfile.BadZipFile):
+            self.remove(cbz_path)
+            return None
+        entry = self._entry(filename, match.group("series"), match.group("number"), pages, stat.st_size, stat.st_mtime_ns, sha256)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO chapters (filename, series, chapter, pages, bytes, mtime_ns, sha256) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (filename, entry["series"], entry["chapter"], pages, stat.st_size, stat.st_mtime_ns, sha256),
+                )
+            self._forget(filename)
+            self._remember(entry)
+        return entry
+
+    def remove(self, cbz_path):
+        filename = os.path.basename(cbz_path)
+        with self._lock:
+            if self._forget(filename):
+                with self._conn:
+                    self._conn.execute("DELETE FROM chapters WHERE filename = ?", (filename,))
+
+    def scan(self):
+        """Reconcile the index with the library root, re-reading only new or changed files."""
+        seen = set()
+        added = 0
+        with os.scandir(self.root) as entries:
+            for dir_entry in entries:
+                if not dir_entry.is_file() or not CBZ_PATTERN.match(dir_entry.name):
+                    continue
+                seen.add(dir_entry.name)
+                known = self._by_filename.get(dir_entry.name)
+                stat = dir_entry.stat()
+                if known and known["bytes"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                if self.record(dir_entry.path):
+                    added += 1
+        removed = [filename for filename in list(self._by_filename) if filename not in seen]
+        for filename in removed:
+            self.remove(filename)
+        return added, len(removed)
+
+    def _entry(self, filename, series, chapter, pages, nbytes, mtime_ns, sha256):
+        return {
+            "filename": filename,
+            "path": os.path.join(self.root, filename),
+            "series": series,
+            "chapter": chapter,
+            "pages": pages,
+            "bytes": nbytes,
+            "mtime_ns": mtime_ns,
+            "sha256": sha256,
+        }
+
+    def _remember(self, entry):
+        self._by_filename[entry["filename"]] = entry
+        self._by_series.setdefault(entry["series"], {})[entry["chapter"]] = entry
+
+    def _forget(self, filename):
+        entry = self._by_filename.pop(filename, None)
+        if entry is None:
+            return False
+        chapters = self._by_series.get(entry["series"], {})
+        chapters.pop(entry["chapter"], None)
+        if not chapters:
+            self._by_series.pop(entry["series"], None)
+        return True
+
+_LIBRARY = None
+_LIBRARY_LOCK = threading.Lock()
+
+def library_index():
+    global _LIBRARY
+    with _LIBRARY_LOCK:
+        if _LIBRARY is None:
+            _LIBRARY = LibraryIndex()
+            _LIBRARY.scan()
+        return _LIBRARY
@@ -1,59 +1,185 @@
+import argparse
 import curses
+import os
 import sys
 from ui import MenuOptions, display_message
-from data import load_read_list
-from network import search_manga, continue_reading, process_chapter
-from viewer import MangaViewer
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt
+from library import LibraryConfig
+from transcode import TranscodeConfig
+import metrics
+
+# network (requests), viewer (PyQt5) and the parsers are imported where they are
+# first needed, so the menu and headless commands start without loading them.
+
+# Options a viewer service started from this process inherits; filled in from the command line.
+VIEWER_SERVICE_ARGS = []
+# Let the viewer download the chosen chapter itself and show pages as they arrive.
+STREAM_CHAPTERS = False
+
+def read_series(stdscr, series_name, chapters, current_index, cookies):
+    from network import process_chapter
+    from data import load_read_list
+    from viewerservice import ViewerServiceConfig, open_in_viewer
+
+    current_chapter = chapters[current_index]
+    if STREAM_CHAPTERS:
+        current_cbz, opened = None, f"Streaming {current_chapter['text']} into the viewer."
+    else:
+        current_cbz, message = process_chapter(current_chapter, series_name, cookies, stdscr)
+        display_message(stdscr, message)
+        if not current_cbz:
+            display_message(stdscr, "Failed to create CBZ. Press any key to continue.")
+            stdscr.getch()
+            return stdscr
+        opened = f"Opened {current_chapter['text']} in the viewer."
+
+    # The viewer runs as a long-lived service process, so the menu stays usable while reading.
+    current = load_read_list().get(series_name, {}).get("current", {})
+    page = current.get("page") if current.get("chapter") == current_chapter["number"] else None
+    ViewerServiceConfig.SERVICE_ARGS = VIEWER_SERVICE_ARGS
+    error = open_in_viewer(current_cbz, chapters, current_index, series_name, cookies, page)
+    display_message(stdscr, f"Viewer error: {error}. Press any key to continue." if error else f"{opened} Press any key to continue.")
+    stdscr.getch()
+    return stdscr
 
 def main(stdscr):
     menu = MenuOptions()
     while True:
         choice = menu.get_choice(stdscr)
+        if choice != 3:
+            # The viewer service records reading progress from its own process.
+            from data import reload_read_list
+            reload_read_list()
         if choice == 0:  
             try:
+                from network import search_manga
                 series_name, chapters, current_index, cookies = search_manga(stdscr)
                 if not (series_name and chapters):
                     display_message(stdscr, "Search failed. Press any key to continue.")
                     stdscr.getch()
                     continue
 
-                current_chapter = chapters[current_index]
-                current_cbz, message = process_chapter(current_chapter, series_name, cookies, stdscr)
-
-                display_message(stdscr, message)
-                if current_cbz:
-                    curses.endwin()  
-                    try:
-                        app = QApplication(sys.argv)
-                        viewer = MangaViewer(current_cbz, chapters, current_index, series_name, cookies, stdscr)
-                        viewer.showMaximized()
-                        sys.exit(app.exec_())
-                    except Exception as e:
-                        print(f"Viewer error: {e}")
-                        display_message(stdscr, f"Viewer error: {e}. Press any key to continue.")
-                        stdscr.getch()
-                    finally:
-                        stdscr = curses.initscr()
-                        stdscr.keypad(True)
-                        stdscr.refresh()
-
-                else:
-                    display_message(stdscr, "Failed to create CBZ. Press any key to continue.")
-                    stdscr.getch()
+                stdscr = read_series(stdscr, series_name, chapters, current_index, cookies)
 
             except Exception as e:
                 display_message(stdscr, f"Error: {str(e)}. Press any key to continue.")
                 stdscr.getch()
 
         elif choice == 1:  
-            continue_reading(stdscr)
+            from network import continue_reading
+            series_name, chapters, current_index, cookies = continue_reading(stdscr)
+            if series_name and chapters:
+                stdscr = read_series(stdscr, series_name, chapters, current_index, cookies)
 
-        elif choice == 2: 
+        elif choice == 2:
+            from updates import check_updates, format_updates
+            display_message(stdscr, "Checking followed series for new chapters...")
+            display_message(stdscr, format_updates(check_updates()) + "\nPress any key to continue.")
+            stdscr.getch()
+
+        elif choice == 3: 
             menu.Exit()
             break
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="mangareader", description="Terminal manga reader and downloader")
+    parser.add_argument("--library", help="Directory holding downloaded chapters (default: $MANGAREADER_LIBRARY or .)")
+    parser.add_argument("--profile", action="store_true", help="Record timing spans and counters to a JSON lines file")
+    parser.add_argument("--profile-output", default=metrics.MetricsConfig.OUTPUT, metavar="PATH",
+                        help="File for --profile (default: metrics.jsonl); the viewer service writes <name>.viewer.jsonl")
+    parser.add_argument("--pool-size", type=int, help="Keep-alive connections per host (default: 16)")
+    parser.add_argument("--http2", action="store_true", help="Use HTTP/2 for HTTPS hosts (needs httpx[http2])")
+    parser.add_argument("--stream", action="store_true", help="Open chapters in the viewer while they download instead of after")
+    parser.add_argument("--transcode", choices=["webp", "jpeg"], help="Re-encode downloaded pages to this format (needs Pillow)")
+    parser.add_argument("--quality", type=int, default=TranscodeConfig.QUALITY, help="Encoder quality for --transcode")
+    parser.add_argument("--max-width", type=int, default=TranscodeConfig.MAX_WIDTH, help="Downscale wider pages to this width for --transcode")
+    subparsers = parser.add_subparsers(dest="command")
+
+    download = subparsers.add_parser("download", help="Download a range of chapters without the interactive menu")
+    download.add_argument("series", help="Series name to search for")
+    download.add_argument("--chapters", help="Chapter numbers to fetch, e.g. 1-500 or 1-10,15")
+    download.add_argument("--jobs", type=int, default=4, help="Chapters to download concurrently")
+
+    catalog = subparsers.add_parser("catalog", help="Fill or query the local title catalog used for instant search")
+    catalog.add_argument("query", nargs="?", help="Title to look up in the catalog")
+    catalog.add_argument("--crawl", type=int, metavar="PAGES", help="Add series from the first PAGES listing pages")
+
+    blobs = subparsers.add_parser("blobs", help="Show the page blob store's disk use, optionally pruning it")
+    blobs.add_argument("--prune", action="store_true", help="Delete blobs no downloaded chapter or manifest still contains")
+
+    viewer = subparsers.add_parser("viewer", help="Run the viewer service in the foreground (started on demand otherwise)")
+    viewer.add_argument("--stop", action="store_true", help="Ask a running viewer service to quit")
+
+    view = subparsers.add_parser("view", help="Open a CBZ in the viewer service")
+    view.add_argument("cbz", help="Chapter archive to show")
+    view.add_argument("--page", type=int, help="Page to open at (1-based)")
+
+    subparsers.add_parser("check-updates", help="List new chapters for every series in the read list")
+    return parser.parse_args(argv)
+
+def viewer_service_argv(args):
+    """Top-level options a viewer service started from this process should run with."""
+    argv = []
+    if args.library:
+        argv += ["--library", args.library]
+    if args.pool_size:
+        argv += ["--pool-size", str(args.pool_size)]
+    if args.http2:
+        argv.append("--http2")
+    if args.transcode:
+        argv += ["--transcode", args.transcode, "--quality", str(args.quality), "--max-width", str(args.max_width)]
+    if args.profile:
+        # The chapter-open spans are recorded in the service, which needs a file of its own;
+        # the service itself ("viewer") reports the file it was given so its config still matches.
+        output = args.profile_output if args.command == "viewer" else service_profile_output(args.profile_output)
+        argv += ["--profile", "--profile-output", output]
+    return argv
+
+def service_profile_output(path):
+    """metrics.jsonl -> metrics.viewer.jsonl, next to the menu's profile."""
+    root, ext = os.path.splitext(os.path.abspath(path))
+    return f"{root}.viewer{ext}"
+
 if __name__ == "__main__":
-    curses.wrapper(main)
+    args = parse_args(sys.argv[1:])
+    if args.library:
+        LibraryConfig.ROOT = args.library
+    if args.pool_size or args.http2:
+        from session import SessionConfig, HTTP2_AVAILABLE
+        if args.http2 and not HTTP2_AVAILABLE:
+            print("HTTP/2 needs the httpx and h2 packages; using HTTP/1.1.")
+        SessionConfig.POOL_MAXSIZE = args.pool_size or SessionConfig.POOL_MAXSIZE
+        SessionConfig.HTTP2 = args.http2
+    if args.profile:
+        metrics.enable(args.profile_output)
+    if args.transcode:
+        TranscodeConfig.ENABLED = True
+        TranscodeConfig.FORMAT = args.transcode
+        TranscodeConfig.QUALITY = args.quality
+        TranscodeConfig.MAX_WIDTH = args.max_width
+    if args.command == "download":
+        from batch import run_download
+        sys.exit(run_download(args))
+    if args.command == "catalog":
+        from batch import run_catalog
+        sys.exit(run_catalog(args))
+    if args.command == "blobs":
+        from batch import run_blobs
+        sys.exit(run_blobs(args))
+    VIEWER_SERVICE_ARGS[:] = viewer_service_argv(args)
+    STREAM_CHAPTERS = args.stream
+    if args.command == "viewer":
+        from viewerservice import ViewerServiceConfig, run_viewer
+        ViewerServiceConfig.SERVICE_ARGS = VIEWER_SERVICE_ARGS
+        sys.exit(run_viewer(args))
+    if args.command == "view":
+        from viewerservice import ViewerServiceConfig, run_view
+        ViewerServiceConfig.SERVICE_ARGS = VIEWER_SERVICE_ARGS
+        sys.exit(run_view(args))
+    if args.command == "check-updates":
+        from updates import run_check_updates
+        sys.exit(run_check_updates(args))
+    try:
+        curses.wrapper(main)
+    finally:
+        from viewerservice import stop_started_service
+        stop_started_service()
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import threading
+
+class ChapterManifest:
+    """Append-only record of a chapter's expected page URLs and the pages received so far.
+
+    The first line lists the chapter and page URLs; every page that lands adds
+    one line with its member name, size and SHA-256, so an interrupted or
+    partially failed download can resume by fetching only what is missing.
+    Pages the server refused outright add a line with the error instead.
+    """
+    def __init__(self, path, chapter_url, image_urls, completed=None, failed=None):
+        self.path = path
+        self.chapter_url = chapter_url
+        self.image_urls = list(image_urls)
+        self.completed = dict(completed or {})
+        self.failed = dict(failed or {})
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def open(cls, path, chapter_url, image_urls):
+        manifest = cls.load(path)
+        if manifest is None or manifest.chapter_url != chapter_url or manifest.image_urls != list(image_urls):
+            manifest = cls(path, chapter_url, image_urls)
+            with open(path, "w") as f:
+                f.write(json.dumps({"chapter_url": chapter_url, "image_urls": manifest.image_urls}) + "\n")
+        manifest._file = open(path, "a")
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as f:
+                header = json.loads(f.readline())
+                completed, failed = {}, {}
+                for line in f:
+                    try:
+                        page = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if "failed" in page:
+                        failed[page["index"]] = page
+                    else:
+                        completed[page["index"]] = page
+                        failed.pop(page["index"], None)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+        return cls(path, header.get("chapter_url"), header.get("image_urls", []), completed, failed)
+
+    def record(self, index, img_name, content, source=None):
+        """Note a page as written; source is the downloaded original when content was re-encoded from it."""
+        page = {
+            "index": index,
+            "url": self.image_urls[index],
+            "name": img_name,
+            "size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+        if source is not None and source is not content:
+            page["source_sha256"] = hashlib.sha256(source).hexdigest()
+        with self._lock:
+            self.completed[index] = page
+            self.failed.pop(index, None)
+            if self._file is not None:
+                self._file.write(json.dumps(page) + "\n")
+                self._file.flush()
+        return page
+
+    def record_failure(self, index, error):
+        """Note a page the server refused outright (e.g. 404); it is retried on a resume but no longer blocks the chapter."""
+        page = {"index": index, "url": self.image_urls[index], "failed": error}
+        with self._lock:
+            self.failed[index] = page
+            if self._file is not None:
+                self._file.write(json.dumps(page) + "\n")
+                self._file.flush()
+        return page
+
+    def forget(self, index):
+        with self._lock:
+            self.completed.pop(index, None)
+
+    def verify(self, index, content):
+        page = self.completed.get(index)
+        return page is not None and page["size"] == len(content) and page["sha256"] == hashlib.sha256(content).hexdigest()
+
+    def missing(self):
+        return [index for index in range(len(self.image_urls)) if index not in self.completed]
+
+    def unavailable(self):
+        return [index for index in self.missing() if index in self.failed]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
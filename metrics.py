@@ -0,0 +1,119 @@
+import atexit
+import contextlib
+import functools
+import json
+import threading
+import time
+
+class MetricsConfig:
+    ENABLED = False
+    OUTPUT = "metrics.jsonl"
+
+class Metrics:
+    """Counters, histograms and timed spans, streamed as JSON lines to a profile file."""
+    def __init__(self, path):
+        self.path = path
+        self.started = time.perf_counter()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "w")
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            duration = time.perf_counter() - start
+            event = {
+                "type": "span",
+                "name": name,
+                "start_ms": round((start - self.started) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+                "thread": threading.current_thread().name,
+            }
+            event.update(attrs)
+            with self._lock:
+                self.histograms.setdefault(name, []).append(duration * 1000)
+                if self._file is not None:
+                    self._file.write(json.dumps(event) + "\n")
+
+    def summary(self):
+        with self._lock:
+            rows = []
+            for name, values in sorted(self.histograms.items()):
+                ordered = sorted(values)
+                rows.append({
+                    "type": "histogram",
+                    "name": name,
+                    "count": len(ordered),
+                    "total": sum(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p99": ordered[min(len(ordered) - 1, round(0.99 * (len(ordered) - 1)))],
+                    "max": ordered[-1],
+                })
+            rows.extend({"type": "counter", "name": name, "value": value} for name, value in sorted(self.counters.items()))
+            return rows
+
+    def close(self):
+        rows = self.summary()
+        with self._lock:
+            if self._file is None:
+                return rows
+            for row in rows:
+                self._file.write(json.dumps(row) + "\n")
+            self._file.close()
+            self._file = None
+        return rows
+
+_METRICS = None
+
+def enable(path=None):
+    """Start recording to path and write the summary when the process exits."""
+    global _METRICS
+    if _METRICS is None:
+        MetricsConfig.ENABLED = True
+        _METRICS = Metrics(path or MetricsConfig.OUTPUT)
+        atexit.register(report)
+    return _METRICS
+
+def incr(name, value=1):
+    if _METRICS is not None:
+        _METRICS.incr(name, value)
+
+def span(name, **attrs):
+    if _METRICS is None:
+        return contextlib.nullcontext(attrs)
+    return _METRICS.span(name, **attrs)
+
+def timed(name):
+    """Decorator recording every call of the wrapped function as a span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def format_summary(rows):
+    lines = [f"{'metric':<24} {'count':>7} {'total ms':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for row in rows:
+        if row["type"] == "histogram":
+            lines.append(f"{row['name']:<24} {row['count']:>7} {row['total']:>10.1f} {row['p50']:>9.2f} {row['p99']:>9.2f} {row['max']:>9.2f}")
+        else:
+            lines.append(f"{row['name']:<24} {row['value']:>7}")
+    return "\n".join(lines)
+
+def report():
+    if _METRICS is None:
+        return
+    rows = _METRICS.close()
+    if rows:
+        print(f"Profile written to {_METRICS.path}")
+        print(format_summary(rows))
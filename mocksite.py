@@ -0,0 +1,153 @@
+import hashlib
+import http.server
+import multiprocessing
+import os
+import random
+import re
+import time
+
+class MockSiteConfig:
+    LATENCY = 0.05
+    BANDWIDTH = 0
+    CHAPTERS = 5
+    PAGES_PER_CHAPTER = 20
+    IMAGE_BYTES = 300 * 1024
+    SEED = 0
+    WRITE_CHUNK = 16 * 1024
+
+ABSOLUTE_URL = re.compile(r"https?://[^/\"'\s<>]+")
+IMAGE_PATH = re.compile(r"\.(jpe?g|png|webp|gif)$", re.IGNORECASE)
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+def synthetic_image(path, size, seed):
+    """Deterministic incompressible bytes behind a JPEG signature, so runs are reproducible."""
+    rng = random.Random(f"{seed}:{path}")
+    return JPEG_HEADER + rng.randbytes(max(0, size - len(JPEG_HEADER)))
+
+def search_html(base, chapters):
+    return (
+        f'<div class="row c-tabs-item__content"><h3 class="h4"><a href="{base}/manga/mock-series/">Mock Series</a></h3>'
+        '<div class="post-content_item mg_status"><div class="summary-content">OnGoing</div></div>'
+        f'<div class="meta-item latest-chap"><span class="font-meta chapter"><a>Chapter {chapters}</a></span></div>'
+        '<div class="meta-item post-on"><span class="font-meta">today</span></div></div>'
+    )
+
+def series_html(base, chapters):
+    items = "".join(
+        f'<li class="wp-manga-chapter"><a href="{base}/manga/mock-series/chapter-{number}/">Chapter {number}</a></li>'
+        for number in range(chapters, 0, -1)
+    )
+    return f"<ul>{items}</ul>"
+
+def chapter_html(base, chapter, pages):
+    return "".join(
+        f'<img class="wp-manga-chapter-img img-responsive" src="{base}/images/{chapter}/{page:03d}.jpg">'
+        for page in range(pages)
+    )
+
+class MockSiteHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server.site
+        base = f"http://{self.headers.get('Host')}"
+        content_type = "text/html; charset=utf-8"
+        if IMAGE_PATH.search(self.path):
+            body = synthetic_image(self.path, site["image_bytes"], site["seed"])
+            content_type = "image/jpeg"
+        elif "?s=" in self.path:
+            body = self.page("search", base, lambda: search_html(base, site["chapters"]))
+        elif "/chapter-" in self.path:
+            chapter = self.path.rstrip("/").rsplit("chapter-", 1)[-1]
+            body = self.page("chapter", base, lambda: chapter_html(base, chapter, site["pages"]))
+        elif self.path.startswith("/manga/"):
+            body = self.page("series", base, lambda: series_html(base, site["chapters"]))
+        else:
+            self.send_error(404)
+            return
+
+        time.sleep(site["latency"])
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.write_throttled(body, site["bandwidth"])
+
+    def page(self, kind, base, generate):
+        """Serve a recorded fixture with its absolute URLs pointed at this server, else synthetic HTML."""
+        fixture = self.server.site["fixtures"].get(kind)
+        html = ABSOLUTE_URL.sub(base, fixture) if fixture is not None else generate()
+        return html.encode("utf-8")
+
+    def write_throttled(self, body, bandwidth):
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        for offset in range(0, len(body), MockSiteConfig.WRITE_CHUNK):
+            chunk = body[offset:offset + MockSiteConfig.WRITE_CHUNK]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / bandwidth)
+
+def load_fixtures(directory):
+    fixtures = {}
+    if directory:
+        for kind in ("search", "series", "chapter"):
+            path = os.path.join(directory, f"{kind}.html")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    fixtures[kind] = f.read()
+    return fixtures
+
+def serve(site, ready):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MockSiteHandler)
+    server.daemon_threads = True
+    server.site = site
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+class MockSite:
+    """Local stand-in for the manga site, served from a child process so it does not skew client timings."""
+    def __init__(self, latency=MockSiteConfig.LATENCY, bandwidth=MockSiteConfig.BANDWIDTH, chapters=MockSiteConfig.CHAPTERS,
+                 pages=MockSiteConfig.PAGES_PER_CHAPTER, image_bytes=MockSiteConfig.IMAGE_BYTES, seed=MockSiteConfig.SEED, fixtures=None):
+        self.site = {
+            "latency": latency,
+            "bandwidth": bandwidth,
+            "chapters": chapters,
+            "pages": pages,
+            "image_bytes": image_bytes,
+            "seed": seed,
+            "fixtures": load_fixtures(fixtures),
+        }
+        self.process = None
+        self.base_url = None
+
+    def start(self):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=serve, args=(self.site, ready), daemon=True)
+        self.process.start()
+        self.base_url = f"http://127.0.0.1:{ready.get(timeout=10)}"
+        return self.base_url
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -1,13 +1,24 @@
+import hashlib
 import requests
-from bs4 import BeautifulSoup
-import re
 import time
 import concurrent.futures
 import os
-from data import load_read_list, create_cbz
-from utils import clean_filename, top_left_menu, get_root
-from viewer import MangaViewer
+import random
+from data import load_read_list, CbzWriter, sniff_image_format
+from progress import progress_store
+from utils import clean_filename, top_left_menu, show_status, prompt_with_suggestions
+from scheduler import FetchScheduler, Priority
+from cache import HttpCache
+from session import create_session
+from library import library_index
+from blobstore import blob_store
+from transcode import transcoder
+from manifest import ChapterManifest
+from chapters import build_chapter_list, chapter_number_value
+from parsing import extract_image_urls, extract_chapter_links, extract_search_results, extract_listing_titles
+from catalog import CatalogConfig, title_catalog
 import curses
+import metrics
 
 class NetworkConfig:
     BASE_URL = "https://www.mangaread.org/manga/"
@@ -25,94 +36,326 @@ class NetworkConfig:
         'Accept-Language': 'en-CA,en-US;q=0.7,en;q=0.3',
         'Accept-Encoding': 'gzip, deflate, br, zstd',
     }
-    MAX_WORKERS = 5
+    MAX_WORKERS = 8
+    MAX_PER_HOST = 4
     MIN_FILE_SIZE = 1024
+    CHUNK_SIZE = 64 * 1024
+    RETRIES = 4
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 8.0
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 CONFIG = NetworkConfig()
-SESSION = requests.Session()
-
-def get_image_urls(chapter_url, cookies, retries=3, delay=2):
+SESSION = create_session()
+SCHEDULER = FetchScheduler(CONFIG.MAX_WORKERS, CONFIG.MAX_PER_HOST)
+HTTP_CACHE = HttpCache()
+
+def fetch_page(url, page_type, cookies=None):
+    with metrics.span("http.get", kind=page_type) as attrs:
+        response = HTTP_CACHE.get(SESSION, url, page_type, headers=CONFIG.DEFAULT_HEADERS, cookies=cookies)
+        attrs["cached"] = getattr(response, "from_cache", False)
+    metrics.incr("http.cache_hits" if attrs["cached"] else "http.cache_misses")
+    return response
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter before retry number attempt + 1."""
+    delay = min(CONFIG.BACKOFF_MAX, CONFIG.BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def get_image_urls(chapter_url, cookies, retries=CONFIG.RETRIES):
     for attempt in range(retries):
         try:
-            response = SESSION.get(chapter_url, headers=CONFIG.DEFAULT_HEADERS, cookies=cookies, timeout=10)
+            response = fetch_page(chapter_url, "chapter", cookies)
             response.raise_for_status() 
-            soup = BeautifulSoup(response.text, "html.parser")
-            image_tags = soup.find_all("img", class_="wp-manga-chapter-img")
-            image_urls = [img["src"] for img in image_tags if "src" in img.attrs]
-            return image_urls, None
+            with metrics.span("parse.chapter"):
+                return extract_image_urls(response.text), None
         except requests.RequestException as e:
             error_msg = f"Attempt {attempt + 1}/{retries} failed: {str(e)}"
             if attempt + 1 == retries:
                 return [], f"Failed to retrieve chapter page after {retries} attempts: {error_msg}"
-            time.sleep(delay)
+            time.sleep(backoff_delay(attempt))
 
-def download_images(image_urls, cookies, stdscr):
-    image_data = []
+def fetch_image(url, cookies, retries=CONFIG.RETRIES):
+    """Return (content, error, permanent); permanent is True when the server refused the page outright (e.g. 404)."""
+    for attempt in range(retries):
+        try:
+            with metrics.span("http.get", kind="image") as attrs, \
+                    SESSION.get(url, headers=CONFIG.IMAGE_HEADERS, cookies=cookies, stream=True, timeout=10) as response:
+                attrs["status"] = response.status_code
+                if response.status_code == 200:
+                    content = bytearray()
+                    for chunk in response.iter_content(chunk_size=CONFIG.CHUNK_SIZE):
+                        content.extend(chunk)
+                    attrs["bytes"] = len(content)
+                    metrics.incr("http.image_bytes", len(content))
+                    return bytes(content), None, False
+                error = f"Failed to fetch {url} - Status code {response.status_code}"
+                if response.status_code not in CONFIG.RETRY_STATUSES:
+                    return None, error, 400 <= response.status_code < 500
+        except requests.RequestException as e:
+            error = f"Failed to fetch {url}: {e}"
+        metrics.incr("http.failed_attempts")
+        if attempt + 1 < retries:
+            time.sleep(backoff_delay(attempt))
+    return None, f"{error} (after {retries} attempts)", False
+
+def page_name(idx):
+    return f"image_{idx + 1:03d}.jpg"
+
+def download_image_to_cbz(idx, url, cookies, writer, manifest=None, stream=None, stats=None):
+    img_name = page_name(idx)
+    store = blob_store()
+    content = store.get_by_url(url) if store else None
+    if content is not None:
+        status = "Reused"
+    else:
+        content, error, permanent = fetch_image(url, cookies)
+        if error:
+            if permanent and manifest:
+                manifest.record_failure(idx, error)
+            return None, error
+        if store and sniff_image_format(content):
+            store.put(content, url)
+        if stats is not None:
+            stats.record(1, len(content))
+        status = "Fetched"
+
+    img_name = write_page(idx, img_name, content, writer, manifest, stream)
+    return img_name, f"{status}: {img_name}"
+
+def write_page(idx, img_name, source, writer, manifest=None, stream=None):
+    """Transcode a downloaded page if enabled, add it to the chapter and record it; returns the member name."""
+    content = source
+    pipeline = transcoder()
+    if pipeline and sniff_image_format(source):
+        img_name, content = pipeline.transcode(img_name, source)
+    writer.add(img_name, content)
+    if manifest:
+        manifest.record(idx, img_name, content, source)
+    if stream:
+        stream.page(idx, img_name, content)
+    return img_name
+
+def download_images(image_urls, cookies, stdscr, writer, priority=Priority.VIEWING, progress=None, manifest=None, indices=None, stream=None, group=None, stats=None):
+    fetched = []
+    group = writer if group is None else group
     messages = []
+    if indices is None:
+        indices = range(len(image_urls))
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_url = {
-            executor.submit(SESSION.get, url, headers=CONFIG.IMAGE_HEADERS, cookies=cookies, stream=True): (idx, url)
-            for idx, url in enumerate(image_urls)
-        }
+    future_to_url = {
+        SCHEDULER.submit(image_urls[idx], download_image_to_cbz, idx, image_urls[idx], cookies, writer, manifest, stream, stats, priority=priority, group=group): image_urls[idx]
+        for idx in indices
+    }
+    try:
         for future in concurrent.futures.as_completed(future_to_url):
-            idx, url = future_to_url[future]
+            url = future_to_url[future]
             try:
-                response = future.result()
-                if response.status_code == 200:
-                    img_name = f"image_{idx + 1:03d}.jpg"
-                    image_data.append((img_name, response.content))
-                    messages.append(f"Fetched: {img_name}")
-                else:
-                    messages.append(f"Failed to fetch {url} - Status code {response.status_code}")
+                img_name, message = future.result()
+                if img_name:
+                    fetched.append(img_name)
+                messages.append(message)
             except Exception as e:
                 messages.append(f"Failed to fetch {url}: {e}")
-
-    return image_data, messages
-
-def process_chapter(chapter, series_name, cookies, stdscr):
-    cbz_filename = f"{series_name}_Chapter_{chapter['number']}.cbz"
+            if progress:
+                progress(len(messages), len(future_to_url))
+    except BaseException:
+        SCHEDULER.cancel(group)
+        concurrent.futures.wait(future_to_url)
+        raise
+
+    return fetched, messages
+
+def resume_chapter(cbz_filename, manifest, stream=None):
+    """Open the chapter's writer, keeping pages from an earlier attempt that still match the manifest.
+
+    Pages are taken from the unfinished .part archive when it survived intact,
+    otherwise from the blob store by checksum. Transcoded pages are rebuilt from
+    their downloaded original, which is what the blob store keeps. Returns the
+    writer and the page indices that still have to be downloaded; kept pages
+    are passed on to stream.
+    """
+    writer = CbzWriter(cbz_filename, resume=True)
+    kept = {}
+    for idx, page in list(manifest.completed.items()):
+        content = writer.read_existing(page["name"]) if page["name"] in writer.existing else None
+        if content is not None and manifest.verify(idx, content):
+            kept[page["name"]] = (idx, content if stream else None)
+    if kept.keys() != writer.existing:
+        writer.close(commit=False)
+        writer = CbzWriter(cbz_filename)
+        kept = {}
+    if stream:
+        stream.begin(len(manifest.image_urls))
+        for img_name, (idx, content) in kept.items():
+            stream.page(idx, img_name, content)
+
+    store = blob_store()
+    for idx, page in list(manifest.completed.items()):
+        if page["name"] in kept:
+            continue
+        source_digest = page.get("source_sha256")
+        if source_digest:
+            source = store.get(source_digest) if store else None
+            if source is not None and hashlib.sha256(source).hexdigest() == source_digest:
+                write_page(idx, page_name(idx), source, writer, manifest, stream)
+            else:
+                manifest.forget(idx)
+            continue
+        content = store.get(page["sha256"]) if store else None
+        if content is not None and manifest.verify(idx, content):
+            writer.add(page["name"], content)
+            if stream:
+                stream.page(idx, page["name"], content)
+        else:
+            manifest.forget(idx)
+    return writer, manifest.missing()
+
+@metrics.timed("chapter.process")
+def process_chapter(chapter, series_name, cookies, stdscr=None, priority=Priority.VIEWING, stats=None, progress=None, stream=None, group=None):
+    """Download a chapter into its CBZ and return (cbz_filename, message).
+
+    stream, if given, gets begin(total) once the page list is known and
+    page(index, img_name, content) as each page is written, so a viewer can
+    show the chapter before the archive is finished. Chapters already on disk
+    are returned without calling it. Fetches are submitted under group, if
+    given, so the caller can SCHEDULER.cancel(group) them.
+    """
+    library = library_index()
+    cbz_filename = library.chapter_path(series_name, chapter['number'])
     
+    if library.get(series_name, chapter['number']):
+        return cbz_filename, f"Using existing file: {cbz_filename}"
     if os.path.exists(cbz_filename):
         file_size = os.path.getsize(cbz_filename)
-        if file_size > 1024:
+        if file_size > CONFIG.MIN_FILE_SIZE and library.record(cbz_filename):
             return cbz_filename, f"Using existing file: {cbz_filename}"
         else:
             os.remove(cbz_filename)
-            stdscr.addstr(0, 0, f"Existing file {cbz_filename} too small, re-fetching...")
-            stdscr.refresh()
+            show_status(stdscr, 0, f"Existing file {cbz_filename} too small, re-fetching...")
     
     chapter_url = chapter["url"]
+    if not chapter_url:
+        return None, f"{chapter['text']} is not available offline."
     message = f"Fetching images from: {chapter['text']}"
-    stdscr.addstr(1, 0, message)
-    stdscr.refresh()
+    show_status(stdscr, 1, message)
 
-    image_urls, error = get_image_urls(chapter_url, cookies)
+    image_urls, error = SCHEDULER.submit(chapter_url, get_image_urls, chapter_url, cookies, priority=priority, group=group).result()
     if error:
         return None, f"Error: {error}"
     if image_urls:
-        stdscr.addstr(2, 0, f"Found {len(image_urls)} images")
-        stdscr.refresh()
-        image_data, download_messages = download_images(image_urls, cookies, stdscr)
-        if not image_data:
-            return None, "No images fetched successfully."
-        cbz_message = create_cbz(image_data, cbz_filename)
-        
+        show_status(stdscr, 2, f"Found {len(image_urls)} images")
+        manifest = ChapterManifest.open(f"{cbz_filename}.manifest", chapter_url, image_urls)
+        writer, pending = resume_chapter(cbz_filename, manifest, stream)
+        if len(pending) < len(image_urls):
+            show_status(stdscr, 3, f"Resuming: {len(image_urls) - len(pending)} pages kept, {len(pending)} to fetch")
+        try:
+            download_images(image_urls, cookies, stdscr, writer, priority, progress, manifest, pending, stream, group, stats)
+        except BaseException:
+            writer.close(commit=False, keep_partial=True)
+            manifest.close()
+            raise
+        missing = manifest.missing()
+        unavailable = manifest.unavailable()
+        if len(missing) > len(unavailable) or not manifest.completed:
+            writer.close(commit=False, keep_partial=True)
+            manifest.close()
+            return None, f"{len(missing)} of {len(image_urls)} pages failed; run again to fetch only the missing pages."
+        # Pages the site refused outright would fail the same way on every run; save the chapter without them.
+        writer.close()
+        manifest.remove()
+
         file_size = os.path.getsize(cbz_filename)
-        if file_size <= 1024:
+        if file_size <= CONFIG.MIN_FILE_SIZE:
             os.remove(cbz_filename)
+            library.remove(cbz_filename)
             return None, f"File {cbz_filename} too small ({file_size} bytes), likely corrupt."
+        if unavailable:
+            return cbz_filename, f"Saved without {len(unavailable)} of {len(image_urls)} pages the site no longer serves."
         return cbz_filename, ""
     else:
         return None, "No images found."
 
+def search_url(query):
+    return f"{CONFIG.BASE_URL}{CONFIG.SEARCH_SUFFIX}{'+'.join(query.split())}{CONFIG.POST_TYPE_SUFFIX}"
+
+def parse_chapter_list(html, series_name, known=None):
+    """Parse a series page into chapters in reading order, reusing entries from the known list."""
+    with metrics.span("parse.series"):
+        links = extract_chapter_links(html)
+        chapters = build_chapter_list(links, known)
+    return attach_cbz_filenames(chapters, series_name)
+
+def fetch_search_results(query):
+    response = fetch_page(search_url(query), "search")
+    if response.status_code != 200:
+        return None, f"Failed to retrieve data. Status code: {response.status_code}"
+    with metrics.span("parse.search"):
+        manga_data = extract_search_results(response.text)
+    title_catalog().add(manga_data)
+    return manga_data, None
+
+def listing_url(page):
+    return CONFIG.BASE_URL if page <= 1 else f"{CONFIG.BASE_URL}page/{page}/"
+
+def crawl_listing(pages, progress=None):
+    """Add the series on the first pages of the site listing to the local title catalog."""
+    catalog = title_catalog()
+    found = 0
+    for page in range(1, pages + 1):
+        response = fetch_page(listing_url(page), "listing")
+        if response.status_code != 200:
+            break
+        with metrics.span("parse.listing"):
+            manga_data = extract_listing_titles(response.text)
+        if not manga_data:
+            break
+        catalog.add(manga_data)
+        found += len(manga_data)
+        if progress:
+            progress(page, found)
+    return found
+
+def find_manga(query):
+    """Answer a search from the local title catalog when it has a confident hit, otherwise online."""
+    catalog = title_catalog()
+    matches = catalog.search(query)
+    if catalog.is_confident(matches):
+        return [manga for score, manga in matches if score >= CatalogConfig.CONFIDENT_SCORE], True, None
+    manga_data, error = fetch_search_results(query)
+    return manga_data, False, error
+
+def attach_cbz_filenames(chapters, series_name):
+    library = library_index()
+    for chapter in chapters:
+        chapter["cbz_filename"] = library.chapter_path(series_name, chapter["number"])
+    return chapters
+
+def fetch_chapters(manga_url, series_name):
+    response = fetch_page(manga_url, "series")
+    if response.status_code != 200:
+        return None, None, f"Failed to retrieve manga page. Status code: {response.status_code}"
+    store = progress_store()
+    known = store.chapter_list(series_name) if store.series_url(series_name) == manga_url else None
+    if known and getattr(response, "from_cache", False):
+        return attach_cbz_filenames(known, series_name), response.cookies, None
+    chapters = parse_chapter_list(response.text, series_name, known)
+    store.update_series(series_name, manga_url, chapters)
+    return chapters, response.cookies, None
+
+def manga_menu_options(manga_data):
+    return [
+        f"{index + 1}. {manga['title']} - {manga['status']} - Latest: {manga['latest_chapter_text']} ({manga['update_time']})"
+        for index, manga in enumerate(manga_data)
+    ]
+
 def search_manga(stdscr):
-    stdscr.clear()
-    stdscr.addstr(0, 0, "Enter manga name: ")
-    stdscr.refresh()
-    curses.echo()
-    manga_name = stdscr.getstr(1, 0, 50).decode('utf-8').strip()
-    curses.noecho()
+    catalog = title_catalog()
+    manga_name, selected = prompt_with_suggestions(
+        stdscr, "Enter manga name: ", lambda text: [manga["title"] for _, manga in catalog.search(text)]
+    )
+    if manga_name is None:
+        return None, None, None, None
 
     if not manga_name:
         stdscr.addstr(2, 0, "Manga name cannot be empty.")
@@ -120,56 +363,39 @@ def search_manga(stdscr):
         stdscr.getch()
         return None, None, None, None
 
-    url = f"{CONFIG.BASE_URL}{CONFIG.SEARCH_SUFFIX}{'+'.join(manga_name.split())}{CONFIG.POST_TYPE_SUFFIX}"
-
-    response = SESSION.get(url, headers=CONFIG.DEFAULT_HEADERS)
-    if response.status_code != 200:
-        stdscr.addstr(2, 0, f"Failed to retrieve data. Status code: {response.status_code}")
+    if selected is not None:
+        manga_data, local, error = [catalog.search(manga_name)[selected][1]], True, None
+    else:
+        manga_data, local, error = find_manga(manga_name)
+    if error:
+        stdscr.addstr(2, 0, error)
         stdscr.refresh()
         stdscr.getch()
         return None, None, None, None
 
-    soup = BeautifulSoup(response.text, "html.parser")
     stdscr.addstr(2, 0, "Searching for manga...\n")
     stdscr.refresh()
-    manga_list = soup.select(".row.c-tabs-item__content")
-    if not manga_list:
+    if not manga_data:
         stdscr.addstr(3, 0, "No manga found in the search results.")
         stdscr.refresh()
         stdscr.getch()
         return None, None, None, None
 
-    manga_data = []
-    manga_options = []
-    for index, manga in enumerate(manga_list):
-        h3_tag = manga.find("h3", class_="h4")
-        title_tag = h3_tag.find("a") if h3_tag else None
-        title = title_tag.text.strip() if title_tag else "Unknown Title"
-        manga_url = title_tag["href"] if title_tag else "No URL"
-        status_div = manga.find("div", class_="post-content_item mg_status")
-        status_tag = status_div.find("div", class_="summary-content") if status_div else None
-        status = status_tag.text.strip() if status_tag else "Unknown Status"
-        latest_div = manga.find("div", class_="meta-item latest-chap")
-        chapter_span = latest_div.find("span", class_="font-meta chapter") if latest_div else None
-        latest_chapter_tag = chapter_span.find("a") if chapter_span else None
-        latest_chapter_text = latest_chapter_tag.text.strip() if latest_chapter_tag else "No Chapter"
-        latest_chapter_match = re.search(r'Chapter (\d+)', latest_chapter_text)
-        latest_chapter_number = latest_chapter_match.group(1) if latest_chapter_match else "Unknown"
-        update_div = manga.find("div", class_="meta-item post-on")
-        update_time_tag = update_div.find("span", class_="font-meta") if update_div else None
-        update_time = update_time_tag.text.strip() if update_time_tag else "Unknown Date"
-
-        manga_data.append({
-            "title": title,
-            "url": manga_url,
-            "status": status,
-            "latest_chapter_number": latest_chapter_number,
-            "latest_chapter_text": latest_chapter_text,
-            "update_time": update_time
-        })
-        manga_options.append(f"{index + 1}. {title} - {status} - Latest: {latest_chapter_text} ({update_time})")
+    manga_options = manga_menu_options(manga_data)
+    if local:
+        manga_options.append(f"Search online for '{manga_name}'")
 
     choice = top_left_menu(stdscr, manga_options, "Select a manga:")
+    if local and choice == len(manga_data):
+        manga_data, error = fetch_search_results(manga_name)
+        if error or not manga_data:
+            stdscr.clear()
+            stdscr.addstr(0, 0, error or "No manga found in the search results.")
+            stdscr.refresh()
+            stdscr.getch()
+            return None, None, None, None
+        manga_options = manga_menu_options(manga_data)
+        choice = top_left_menu(stdscr, manga_options, "Select a manga:")
     if choice is None or choice < 0 or choice >= len(manga_data):
         stdscr.clear()
         stdscr.addstr(0, 0, "Invalid manga choice.")
@@ -186,33 +412,20 @@ def search_manga(stdscr):
     stdscr.refresh()
     time.sleep(2)
 
-    response = SESSION.get(chosen_manga["url"], headers=CONFIG.DEFAULT_HEADERS)
-    if response.status_code != 200:
-        stdscr.addstr(4, 0, f"Failed to retrieve manga page. Status code: {response.status_code}")
+    series_name = clean_filename(chosen_manga['title'])
+    chapters, cookies, error = fetch_chapters(chosen_manga["url"], series_name)
+    if error:
+        stdscr.addstr(4, 0, error)
         stdscr.refresh()
         stdscr.getch()
         return None, None, None, None
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    chapter_tags = soup.select(".wp-manga-chapter a")
-    if not chapter_tags:
+    if not chapters:
         stdscr.addstr(4, 0, "No chapters found on the manga page.")
         stdscr.refresh()
         stdscr.getch()
         return None, None, None, None
 
-    chapters = []
-    chapter_options = []
-    for index, tag in enumerate(chapter_tags):
-        chapter_text = tag.text.strip()
-        chapter_url = tag["href"]
-        chapter_match = re.search(r'chapter-(\d+)', chapter_url)
-        chapter_number = chapter_match.group(1) if chapter_match else "Unknown"
-        chapters.append({"text": chapter_text, "url": chapter_url, "number": chapter_number, "cbz_filename": f"{clean_filename(chosen_manga['title'])}_Chapter_{chapter_number}.cbz"})
-        chapter_options.append(f"{chapter_text}")
-
-    chapters.sort(key=lambda x: int(x["number"]) if x["number"] != "Unknown" else 0)
-    chapter_options.sort(key=lambda x: int(re.search(r'Chapter (\d+)', x).group(1)) if re.search(r'Chapter (\d+)', x) else 0)
+    chapter_options = [chapter["text"] for chapter in chapters]
 
     choice = top_left_menu(stdscr, chapter_options, "Select a chapter to start from:")
     stdscr.addstr(5, 0, f"Chapter choice: {choice} (Selected: {chapter_options[choice] if choice is not None else 'None'})")
@@ -225,12 +438,19 @@ def search_manga(stdscr):
         stdscr.getch()
         return None, None, None, None
 
-    series_name = clean_filename(chosen_manga['title'])
     current_index = choice
     stdscr.addstr(6, 0, f"Returning: series_name={series_name}, current_index={current_index}")
     stdscr.refresh()
     time.sleep(2)
-    return series_name, chapters, current_index, response.cookies
+    return series_name, chapters, current_index, cookies
+
+def local_chapters(series_name):
+    """Build a chapter list from the library alone, for reading without the network."""
+    entries = sorted(library_index().chapters(series_name).values(), key=lambda entry: chapter_number_value(entry["chapter"]))
+    return [
+        {"text": f"Chapter {entry['chapter']}", "url": None, "number": entry["chapter"], "cbz_filename": entry["path"]}
+        for entry in entries
+    ]
 
 def continue_reading(stdscr):
     stdscr.clear()
@@ -239,7 +459,7 @@ def continue_reading(stdscr):
         stdscr.addstr(0, 0, "No manga in your read list yet.")
         stdscr.refresh()
         stdscr.getch()
-        return
+        return None, None, None, None
 
     series_list = []
     series_options = []
@@ -253,7 +473,7 @@ def continue_reading(stdscr):
         stdscr.addstr(0, 0, "No series currently being read.")
         stdscr.refresh()
         stdscr.getch()
-        return
+        return None, None, None, None
 
     choice = top_left_menu(stdscr, series_options, "Continue Reading:")
     if choice is None or choice < 0 or choice >= len(series_list):
@@ -261,78 +481,59 @@ def continue_reading(stdscr):
         stdscr.addstr(0, 0, "Invalid choice.")
         stdscr.refresh()
         stdscr.getch()
-        return
+        return None, None, None, None
 
     series_name, chapter_number = series_list[choice]
     stdscr.clear()
     stdscr.addstr(0, 0, f"Resuming {series_name} at Chapter {chapter_number}...")
     stdscr.refresh()
-    time.sleep(1)
-
-    url = f"{CONFIG.BASE_URL}{CONFIG.SEARCH_SUFFIX}{series_name.replace('_', '+')}{CONFIG.POST_TYPE_SUFFIX}"
 
-    response = requests.get(url, headers=CONFIG.DEFAULT_HEADERS)
-    if response.status_code != 200:
-        stdscr.addstr(1, 0, f"Failed to retrieve manga data. Status code: {response.status_code}")
+    store = progress_store()
+    manga_url = store.series_url(series_name)
+    if manga_url:
+        try:
+            chapters, cookies, error = fetch_chapters(manga_url, series_name)
+        except requests.RequestException:
+            chapters, cookies = attach_cbz_filenames(store.chapter_list(series_name), series_name), {}
+        if chapters:
+            current_index = next((i for i, ch in enumerate(chapters) if ch["number"] == chapter_number), 0)
+            return series_name, chapters, current_index, cookies
+
+    if library_index().get(series_name, chapter_number):
+        chapters = local_chapters(series_name)
+        current_index = next((i for i, ch in enumerate(chapters) if ch["number"] == chapter_number), 0)
+        return series_name, chapters, current_index, {}
+
+    manga_data, error = fetch_search_results(series_name.replace('_', ' '))
+    if error:
+        stdscr.addstr(1, 0, error)
         stdscr.refresh()
         stdscr.getch()
-        return
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    manga_list = soup.select(".row.c-tabs-item__content")
-    if not manga_list:
+        return None, None, None, None
+    if not manga_data:
         stdscr.addstr(1, 0, "Manga not found.")
         stdscr.refresh()
         stdscr.getch()
-        return
+        return None, None, None, None
 
-    first_manga = manga_list[0]
-    h3_tag = first_manga.find("h3", class_="h4")
-    manga_url_tag = h3_tag.find("a") if h3_tag else None
-    if not manga_url_tag:
+    manga_url = next((manga["url"] for manga in manga_data if clean_filename(manga["title"]) == series_name), manga_data[0]["url"])
+    if manga_url == "No URL":
         stdscr.addstr(1, 0, "Failed to find manga URL in search results.")
         stdscr.refresh()
         stdscr.getch()
-        return
-    manga_url = manga_url_tag["href"]
+        return None, None, None, None
 
-    response = requests.get(manga_url, headers=CONFIG.DEFAULT_HEADERS)
-    if response.status_code != 200:
-        stdscr.addstr(1, 0, f"Failed to retrieve manga page. Status code: {response.status_code}")
+    chapters, cookies, error = fetch_chapters(manga_url, series_name)
+    if error:
+        stdscr.addstr(1, 0, error)
         stdscr.refresh()
         stdscr.getch()
-        return
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    chapter_tags = soup.select(".wp-manga-chapter a")
-    if not chapter_tags:
+        return None, None, None, None
+    if not chapters:
         stdscr.addstr(1, 0, "No chapters found.")
         stdscr.refresh()
         stdscr.getch()
-        return
-
-    chapters = []
-    for tag in chapter_tags:
-        chapter_text = tag.text.strip()
-        chapter_url = tag["href"]
-        chapter_match = re.search(r'chapter-(\d+)', chapter_url)
-        chapter_number_from_url = chapter_match.group(1) if chapter_match else "Unknown"
-        chapters.append({"text": chapter_text, "url": chapter_url, "number": chapter_number_from_url, "cbz_filename": f"{series_name}_Chapter_{chapter_number_from_url}.cbz"})
-    for key, value in chapters:
-        print(f"{key}: {value}")
-    chapters.sort(key=lambda x: int(x["number"]) if x["number"] != "Unknown" else 0)
+        return None, None, None, None
 
     current_index = next((i for i, ch in enumerate(chapters) if ch["number"] == chapter_number), 0)
-    current_chapter = chapters[current_index]
-    stdscr.clear()
-    stdscr.refresh()
-    current_cbz, message = process_chapter(current_chapter, series_name, response.cookies, stdscr)
-    stdscr.addstr(0, 0, message)
-    stdscr.refresh()
-
-    if current_cbz:
-        root = get_root()
-        MangaViewer(root, current_cbz, chapters, current_index, series_name, response.cookies, stdscr)
-        root.mainloop()
-    else:
-        stdscr.getch()
\ No newline at end of file
+    return series_name, chapters, current_index, cookies
@@ -0,0 +1,151 @@
+import functools
+import importlib.util
+import re
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# bs4 and lxml are only imported when a BeautifulSoup backend actually parses something.
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+
+LATEST_CHAPTER_PATTERN = re.compile(r'Chapter (\d+(?:\.\d+)?)')
+
+def _has_class(class_name):
+    # Strainers see the raw class attribute, so match one class out of a space-separated list.
+    return lambda value: bool(value) and class_name in value.split()
+
+STRAINERS = {
+    "chapter_image": ("img", "wp-manga-chapter-img"),
+    "chapter_list": ("li", "wp-manga-chapter"),
+    "search_result": ("div", "c-tabs-item__content"),
+    "listing_item": ("div", "page-item-detail"),
+}
+
+@functools.lru_cache(maxsize=None)
+def _strainer(name):
+    from bs4 import SoupStrainer
+
+    tag, class_name = STRAINERS[name]
+    return SoupStrainer(tag, class_=_has_class(class_name))
+
+def available_backends():
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    if HAS_LXML:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+DEFAULT_BACKEND = available_backends()[0]
+
+def _soup(html, backend, strainer):
+    from bs4 import BeautifulSoup
+
+    features = "lxml" if backend == "lxml" else "html.parser"
+    return BeautifulSoup(html, features, parse_only=_strainer(strainer))
+
+def extract_image_urls(html, backend=None):
+    backend = backend or DEFAULT_BACKEND
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html)
+        return [node.attributes["src"] for node in tree.css("img.wp-manga-chapter-img") if node.attributes.get("src") is not None]
+    soup = _soup(html, backend, "chapter_image")
+    return [img["src"] for img in soup.find_all("img", class_="wp-manga-chapter-img") if "src" in img.attrs]
+
+def extract_chapter_links(html, backend=None):
+    """Return (text, href) for every chapter link on a series page, in page order."""
+    backend = backend or DEFAULT_BACKEND
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html)
+        return [(node.text().strip(), node.attributes["href"]) for node in tree.css(".wp-manga-chapter a") if node.attributes.get("href") is not None]
+    soup = _soup(html, backend, "chapter_list")
+    return [(tag.text.strip(), tag["href"]) for tag in soup.select(".wp-manga-chapter a") if "href" in tag.attrs]
+
+def _search_result(title, manga_url, status, latest_chapter_text, update_time):
+    latest_chapter_match = LATEST_CHAPTER_PATTERN.search(latest_chapter_text)
+    return {
+        "title": title,
+        "url": manga_url,
+        "status": status,
+        "latest_chapter_number": latest_chapter_match.group(1) if latest_chapter_match else "Unknown",
+        "latest_chapter_text": latest_chapter_text,
+        "update_time": update_time
+    }
+
+def _node_text(node, default):
+    return node.text().strip() if node is not None else default
+
+def extract_search_results(html, backend=None):
+    backend = backend or DEFAULT_BACKEND
+    manga_data = []
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html)
+        for manga in tree.css(".row.c-tabs-item__content"):
+            title_tag = manga.css_first("h3.h4 a")
+            manga_url = title_tag.attributes.get("href") if title_tag is not None else None
+            manga_data.append(_search_result(
+                _node_text(title_tag, "Unknown Title"),
+                manga_url or "No URL",
+                _node_text(manga.css_first(".post-content_item.mg_status .summary-content"), "Unknown Status"),
+                _node_text(manga.css_first(".meta-item.latest-chap span.font-meta.chapter a"), "No Chapter"),
+                _node_text(manga.css_first(".meta-item.post-on span.font-meta"), "Unknown Date"),
+            ))
+        return manga_data
+
+    soup = _soup(html, backend, "search_result")
+    for manga in soup.select(".row.c-tabs-item__content"):
+        h3_tag = manga.find("h3", class_="h4")
+        title_tag = h3_tag.find("a") if h3_tag else None
+        status_div = manga.find("div", class_="post-content_item mg_status")
+        status_tag = status_div.find("div", class_="summary-content") if status_div else None
+        latest_div = manga.find("div", class_="meta-item latest-chap")
+        chapter_span = latest_div.find("span", class_="font-meta chapter") if latest_div else None
+        latest_chapter_tag = chapter_span.find("a") if chapter_span else None
+        update_div = manga.find("div", class_="meta-item post-on")
+        update_time_tag = update_div.find("span", class_="font-meta") if update_div else None
+        manga_data.append(_search_result(
+            title_tag.text.strip() if title_tag else "Unknown Title",
+            title_tag["href"] if title_tag else "No URL",
+            status_tag.text.strip() if status_tag else "Unknown Status",
+            latest_chapter_tag.text.strip() if latest_chapter_tag else "No Chapter",
+            update_time_tag.text.strip() if update_time_tag else "Unknown Date",
+        ))
+    return manga_data
+
+def extract_listing_titles(html, backend=None):
+    """Series cards from a listing page, in the same shape as search results."""
+    backend = backend or DEFAULT_BACKEND
+    manga_data = []
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html)
+        for manga in tree.css(".page-item-detail"):
+            title_tag = manga.css_first(".post-title a")
+            if title_tag is None or not title_tag.attributes.get("href"):
+                continue
+            manga_data.append(_search_result(
+                _node_text(title_tag, "Unknown Title"),
+                title_tag.attributes["href"],
+                "Unknown Status",
+                _node_text(manga.css_first(".chapter-item .chapter a"), "No Chapter"),
+                _node_text(manga.css_first(".chapter-item .post-on"), "Unknown Date"),
+            ))
+        return manga_data
+
+    soup = _soup(html, backend, "listing_item")
+    for manga in soup.select(".page-item-detail"):
+        title_tag = manga.select_one(".post-title a")
+        if title_tag is None or "href" not in title_tag.attrs:
+            continue
+        latest_chapter_tag = manga.select_one(".chapter-item .chapter a")
+        update_time_tag = manga.select_one(".chapter-item .post-on")
+        manga_data.append(_search_result(
+            title_tag.text.strip(),
+            title_tag["href"],
+            "Unknown Status",
+            latest_chapter_tag.text.strip() if latest_chapter_tag else "No Chapter",
+            update_time_tag.text.strip() if update_time_tag else "Unknown Date",
+        ))
+    return manga_data
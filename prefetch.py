@@ -0,0 +1,113 @@
+import concurrent.futures
+import threading
+from scheduler import Priority
+
+class PrefetchConfig:
+    CHAPTERS_AHEAD = 2
+
+class ChapterPrefetcher:
+    """Download the chapters after the one being read on a background thread."""
+    def __init__(self, chapters, series_name, cookies, ahead=PrefetchConfig.CHAPTERS_AHEAD, on_update=None):
+        self.chapters = chapters
+        self.series_name = series_name
+        self.cookies = cookies
+        self.ahead = ahead
+        self.on_update = on_update
+        self.states = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+    def prefetch_from(self, current_index):
+        for index in range(current_index + 1, min(current_index + 1 + self.ahead, len(self.chapters))):
+            self.request(index, Priority.NEXT_CHAPTER if index == current_index + 1 else Priority.BACKGROUND)
+
+    def request(self, index, priority=Priority.NEXT_CHAPTER):
+        with self._lock:
+            if index in self._futures and self.states.get(index) != "failed":
+                return self._futures[index]
+            self.states[index] = "queued"
+            future = self._executor.submit(self._download, index, priority)
+            self._futures[index] = future
+            return future
+
+    def is_ready(self, index):
+        return self.states.get(index) == "ready"
+
+    def shutdown(self):
+        """Stop prefetching: queued chapters are dropped and the one downloading loses its queued pages."""
+        from network import SCHEDULER
+
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        SCHEDULER.cancel(self)
+
+    def _notify(self, index, state, message):
+        with self._lock:
+            if self._closed:
+                return
+            self.states[index] = state
+        if self.on_update:
+            self.on_update(index, state, message)
+
+    def _download(self, index, priority):
+        from network import process_chapter
+
+        chapter = self.chapters[index]
+        self._notify(index, "downloading", f"Prefetching {chapter['text']}...")
+
+        def progress(done, total):
+            self._notify(index, "downloading", f"Prefetching {chapter['text']}: {done}/{total} pages")
+
+        try:
+            cbz_filename, message = process_chapter(chapter, self.series_name, self.cookies, None, priority, progress=progress, group=self)
+        except Exception as e:
+            cbz_filename, message = None, str(e)
+        if cbz_filename:
+            chapter["cbz_filename"] = cbz_filename
+            self._notify(index, "ready", f"{chapter['text']} ready")
+        else:
+            self._notify(index, "failed", f"{chapter['text']}: {message}")
+        return cbz_filename
+
+class ChapterStream:
+    """Download the chapter being opened on its own thread, handing each page over as it is written.
+
+    on_start(total) runs once the page count is known, on_page(index, img_name,
+    content) for every page in arrival order and on_finish(cbz_filename, message)
+    at the end; all three are called from download threads.
+    """
+    def __init__(self, chapter, series_name, cookies, on_start=None, on_page=None, on_finish=None):
+        self.chapter = chapter
+        self.series_name = series_name
+        self.cookies = cookies
+        self.on_start = on_start
+        self.on_page = on_page
+        self.on_finish = on_finish
+        self._thread = threading.Thread(target=self._run, daemon=True, name="chapter-stream")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def begin(self, total):
+        if self.on_start:
+            self.on_start(total)
+
+    def page(self, index, img_name, content):
+        if self.on_page:
+            self.on_page(index, img_name, content)
+
+    def _run(self):
+        from network import process_chapter
+
+        try:
+            cbz_filename, message = process_chapter(self.chapter, self.series_name, self.cookies, None, Priority.VIEWING, stream=self)
+        except Exception as e:
+            cbz_filename, message = None, str(e)
+        if cbz_filename:
+            self.chapter["cbz_filename"] = cbz_filename
+        if self.on_finish:
+            self.on_finish(cbz_filename or "", message)
@@ -0,0 +1,216 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+
+class ProgressConfig:
+    DATABASE = "read_list.db"
+    LEGACY_JSON = "read_list.json"
+    FLUSH_DELAY = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    name TEXT PRIMARY KEY,
+    current_chapter TEXT,
+    current_page TEXT
+);
+CREATE TABLE IF NOT EXISTS read_chapters (
+    series TEXT NOT NULL,
+    chapter TEXT NOT NULL,
+    PRIMARY KEY (series, chapter)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series_sources (
+    name TEXT PRIMARY KEY,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chapter_lists (
+    series TEXT NOT NULL,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    number TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (series, url)
+) WITHOUT ROWID;
+"""
+
+def load_legacy_read_list(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+            for series in list(data.keys()):
+                if isinstance(data[series], list):
+                    data[series] = {"read": data[series], "current": {"chapter": None, "page": None}}
+            return data
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+class ProgressStore:
+    """Reading progress kept in memory and committed to SQLite in debounced batches."""
+    def __init__(self, path=ProgressConfig.DATABASE, legacy_json=ProgressConfig.LEGACY_JSON, flush_delay=ProgressConfig.FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty_series = set()
+        self._new_reads = []
+        self._sources = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        self._load()
+        if not self._current and legacy_json and os.path.exists(legacy_json):
+            self._migrate(legacy_json)
+
+    def load(self):
+        with self._lock:
+            return {
+                series: {"read": sorted(self._read.get(series, ())), "current": dict(current)}
+                for series, current in self._current.items()
+            }
+
+    def mark_read(self, series_name, chapter_number):
+        with self._lock:
+            self._ensure_series(series_name)
+            chapters = self._read.setdefault(series_name, set())
+            if chapter_number in chapters:
+                return
+            chapters.add(chapter_number)
+            self._new_reads.append((series_name, chapter_number))
+            self._schedule_flush()
+
+    def set_position(self, series_name, chapter_number, page_number):
+        with self._lock:
+            self._ensure_series(series_name)
+            self._current[series_name] = {"chapter": chapter_number, "page": str(page_number)}
+            self._dirty_series.add(series_name)
+            self._schedule_flush()
+
+    def replace_all(self, read_list):
+        with self._lock:
+            self._current = {series: dict(data["current"]) for series, data in read_list.items()}
+            self._read = {series: set(data["read"]) for series, data in read_list.items()}
+            self._dirty_series.clear()
+            self._new_reads.clear()
+            with self._conn:
+                self._conn.execute("DELETE FROM read_chapters")
+                self._conn.execute("DELETE FROM series")
+                self._write_series(self._current)
+                self._conn.executemany(
+                    "INSERT INTO read_chapters (series, chapter) VALUES (?, ?)",
+                    [(series, chapter) for series, chapters in self._read.items() for chapter in chapters],
+                )
+
+    def series_url(self, series_name):
+        return self._source(series_name)["url"]
+
+    def chapter_list(self, series_name):
+        """Return the last parsed chapter list for a series as dicts with text, url and number."""
+        return [dict(chapter) for chapter in self._source(series_name)["chapters"]]
+
+    def update_series(self, series_name, url, chapters):
+        """Remember where a series lives and its chapter list, writing only the rows that changed."""
+        chapters = [{"text": ch["text"], "url": ch["url"], "number": ch["number"]} for ch in chapters]
+        with self._lock:
+            source = self._source(series_name)
+            if source["url"] == url and source["chapters"] == chapters:
+                return
+            old_rows = {ch["url"]: (position, ch["number"], ch["text"]) for position, ch in enumerate(source["chapters"])}
+            new_rows = {ch["url"]: (position, ch["number"], ch["text"]) for position, ch in enumerate(chapters)}
+            with self._conn:
+                if source["url"] != url:
+                    self._conn.execute("INSERT OR REPLACE INTO series_sources (name, url) VALUES (?, ?)", (series_name, url))
+                self._conn.executemany(
+                    "DELETE FROM chapter_lists WHERE series = ? AND url = ?",
+                    [(series_name, chapter_url) for chapter_url in old_rows if chapter_url not in new_rows],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chapter_lists (series, url, position, number, text) VALUES (?, ?, ?, ?, ?)",
+                    [(series_name, chapter_url, *row) for chapter_url, row in new_rows.items() if old_rows.get(chapter_url) != row],
+                )
+            self._sources[series_name] = {"url": url, "chapters": chapters}
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty_series and not self._new_reads:
+                return
+            with self._conn:
+                self._write_series({series: self._current[series] for series in self._dirty_series})
+                self._conn.executemany("INSERT OR IGNORE INTO read_chapters (series, chapter) VALUES (?, ?)", self._new_reads)
+            self._dirty_series.clear()
+            self._new_reads.clear()
+
+    def reload(self):
+        """Pick up progress another process, such as the viewer service, committed since this store loaded."""
+        with self._lock:
+            self.flush()
+            self._load()
+            self._sources.clear()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _load(self):
+        self._current = {
+            name: {"chapter": chapter, "page": page}
+            for name, chapter, page in self._conn.execute("SELECT name, current_chapter, current_page FROM series")
+        }
+        self._read = {}
+        for series, chapter in self._conn.execute("SELECT series, chapter FROM read_chapters"):
+            self._read.setdefault(series, set()).add(chapter)
+
+    def _source(self, series_name):
+        with self._lock:
+            source = self._sources.get(series_name)
+            if source is None:
+                row = self._conn.execute("SELECT url FROM series_sources WHERE name = ?", (series_name,)).fetchone()
+                chapters = [
+                    {"text": text, "url": url, "number": number}
+                    for url, number, text in self._conn.execute(
+                        "SELECT url, number, text FROM chapter_lists WHERE series = ? ORDER BY position", (series_name,)
+                    )
+                ]
+                source = self._sources[series_name] = {"url": row[0] if row else None, "chapters": chapters}
+            return source
+
+    def _migrate(self, legacy_json):
+        read_list = load_legacy_read_list(legacy_json)
+        if read_list:
+            self.replace_all(read_list)
+        os.replace(legacy_json, f"{legacy_json}.migrated")
+
+    def _ensure_series(self, series_name):
+        if series_name not in self._current:
+            self._current[series_name] = {"chapter": None, "page": None}
+            self._dirty_series.add(series_name)
+
+    def _write_series(self, current):
+        self._conn.executemany(
+            "INSERT INTO series (name, current_chapter, current_page) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET current_chapter = excluded.current_chapter, current_page = excluded.current_page",
+            [(series, position["chapter"], position["page"]) for series, position in current.items()],
+        )
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+def progress_store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ProgressStore()
+            atexit.register(_STORE.close)
+        return _STORE
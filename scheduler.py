@@ -0,0 +1,109 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+class Priority:
+    VIEWING = 0
+    NEXT_CHAPTER = 1
+    BACKGROUND = 2
+
+class FetchScheduler:
+    """Shared worker pool that dispatches jobs by priority within per-host connection limits."""
+    def __init__(self, max_workers, max_per_host, host_limits=None):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.host_limits = dict(host_limits or {})
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._active = {}
+        self._groups = {}
+        self._counter = itertools.count()
+        self._workers = []
+        self._shutdown = False
+
+    def submit(self, url, fn, *args, priority=Priority.BACKGROUND, group=None, **kwargs):
+        host = urlsplit(url).netloc
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("FetchScheduler has been shut down")
+            job = (priority, next(self._counter), future, fn, args, kwargs, group)
+            heapq.heappush(self._queues.setdefault(host, []), job)
+            if group is not None:
+                self._groups.setdefault(group, set()).add(future)
+                future.add_done_callback(lambda f: self._forget(group, f))
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"fetch-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify()
+        return future
+
+    def cancel(self, group):
+        """Cancel every queued job of a group; jobs already running are left to finish."""
+        with self._cond:
+            cancelled = {future for future in list(self._groups.get(group, ())) if future.cancel()}
+            self._drop(cancelled)
+        return len(cancelled)
+
+    def shutdown(self, cancel_pending=True):
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                self._drop({job[2] for queue in self._queues.values() for job in queue if job[2].cancel()})
+            self._cond.notify_all()
+
+    def _drop(self, cancelled):
+        if not cancelled:
+            return
+        for host, queue in self._queues.items():
+            queue[:] = [job for job in queue if job[2] not in cancelled]
+            heapq.heapify(queue)
+        for future in cancelled:
+            future.set_running_or_notify_cancel()
+
+    def _forget(self, group, future):
+        with self._cond:
+            futures = self._groups.get(group)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._groups[group]
+
+    def _limit(self, host):
+        return self.host_limits.get(host, self.max_per_host)
+
+    def _next_job(self):
+        best_host = None
+        for host, queue in self._queues.items():
+            if not queue or self._active.get(host, 0) >= self._limit(host):
+                continue
+            if best_host is None or queue[0] < self._queues[best_host][0]:
+                best_host = host
+        if best_host is None:
+            return None, None
+        return best_host, heapq.heappop(self._queues[best_host])
+
+    def _work(self):
+        while True:
+            with self._cond:
+                host, job = self._next_job()
+                while job is None or not job[2].set_running_or_notify_cancel():
+                    if job is None:
+                        if self._shutdown:
+                            return
+                        self._cond.wait()
+                    host, job = self._next_job()
+                self._active[host] = self._active.get(host, 0) + 1
+
+            _, _, future, fn, args, kwargs, _ = job
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._active[host] -= 1
+                    self._cond.notify_all()
@@ -0,0 +1,160 @@
+import importlib.util
+import io
+import os
+import ssl
+import threading
+import warnings
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+from urllib3.util.retry import Retry
+
+# httpx is only imported once an Http2Adapter is used, so HTTP/1.1 runs do not pay for loading it.
+HTTP2_AVAILABLE = importlib.util.find_spec("httpx") is not None and importlib.util.find_spec("h2") is not None
+
+class SessionConfig:
+    POOL_CONNECTIONS = 16
+    POOL_MAXSIZE = 16
+    # Connection-level retries only; status-aware backoff (429/5xx) lives in the fetch loops.
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.3
+    HTTP2 = False
+
+def ssl_context(verify, cert):
+    """Build the TLS context requests would use for verify and cert, or False to skip verification."""
+    if verify is False:
+        return False
+    if verify is True:
+        context = ssl.create_default_context()
+    elif os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    else:
+        context = ssl.create_default_context(cafile=verify)
+    if cert:
+        context.load_cert_chain(*cert) if isinstance(cert, (list, tuple)) else context.load_cert_chain(cert)
+    return context
+
+class Http2Body(io.RawIOBase):
+    """File-like body of a streamed httpx response, read by requests' iter_content()."""
+    def __init__(self, response):
+        super().__init__()
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        import httpx
+
+        try:
+            while not self._buffer:
+                self._buffer = next(self._chunks, None)
+                if self._buffer is None:
+                    self._buffer = b""
+                    return 0
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self):
+        self._response.close()
+        super().close()
+
+class Http2Adapter(BaseAdapter):
+    """Transport adapter sending a session's HTTPS requests over multiplexed httpx HTTP/2 connections.
+
+    verify (a CA bundle path or False) and cert are honoured with one httpx
+    client per combination. Requests that need a proxy go through fallback,
+    the session's HTTP/1.1 adapter, so proxy settings are never silently dropped.
+    """
+    def __init__(self, pool_maxsize=SessionConfig.POOL_MAXSIZE, retries=SessionConfig.RETRIES, fallback=None):
+        super().__init__()
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.fallback = fallback
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        import httpx
+
+        if select_proxy(request.url, proxies or {}):
+            if self.fallback is None:
+                raise requests.RequestException("The HTTP/2 adapter cannot use a proxy", request=request)
+            warnings.warn("Using HTTP/1.1 through the configured proxy; the HTTP/2 adapter does not support proxies", RuntimeWarning, stacklevel=2)
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        try:
+            client = self.client(verify, cert)
+            outgoing = client.build_request(request.method, request.url, headers=dict(request.headers), content=request.body, timeout=timeout)
+            response = client.send(outgoing, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+        return self.build_response(request, response, stream)
+
+    def client(self, verify=True, cert=None):
+        import httpx
+
+        key = (verify, tuple(cert) if isinstance(cert, (list, tuple)) else cert)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                transport = httpx.HTTPTransport(http2=True, verify=ssl_context(verify, cert), retries=self.retries,
+                                                limits=httpx.Limits(max_connections=self.pool_maxsize))
+                client = self._clients[key] = httpx.Client(transport=transport)
+            return client
+
+    def build_response(self, request, response, stream=False):
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.reason = response.reason_phrase
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.headers.pop("Content-Encoding", None)
+        result.encoding = get_encoding_from_headers(result.headers)
+        result.url = str(response.url)
+        result.request = request
+        result.connection = self
+        result.cookies = cookiejar_from_dict(dict(response.cookies))
+        if stream:
+            result.raw = Http2Body(response)
+        else:
+            # The body is already read, so iter_content() serves it from memory.
+            result._content = response.content
+            result._content_consumed = True
+        return result
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+def configure_session(session, pool_maxsize=None, retries=None, backoff_factor=None, http2=None):
+    """Mount pooled, retrying adapters on session, replacing whatever was mounted before."""
+    pool_maxsize = pool_maxsize or SessionConfig.POOL_MAXSIZE
+    retries = SessionConfig.RETRIES if retries is None else retries
+    backoff_factor = SessionConfig.BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+    http2 = SessionConfig.HTTP2 if http2 is None else http2
+
+    for adapter in session.adapters.values():
+        adapter.close()
+    retry = Retry(total=retries, connect=retries, read=retries, status=0, backoff_factor=backoff_factor,
+                  allowed_methods=frozenset({"GET", "HEAD"}), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=SessionConfig.POOL_CONNECTIONS, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", Http2Adapter(pool_maxsize, retries, fallback=adapter) if http2 and HTTP2_AVAILABLE else adapter)
+    return session
+
+def create_session(**kwargs):
+    return configure_session(requests.Session(), **kwargs)
@@ -0,0 +1,130 @@
+import concurrent.futures
+import importlib.util
+import io
+import multiprocessing
+import os
+import threading
+import time
+
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+class TranscodeConfig:
+    ENABLED = False
+    FORMAT = "webp"
+    QUALITY = 80
+    MAX_WIDTH = 1600
+    WORKERS = os.cpu_count() or 2
+
+FORMAT_EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+def transcode_image(content, fmt, quality, max_width):
+    """Re-encode one page, downscaling it to max_width; runs in a worker process.
+
+    Returns the new bytes, or None when the page is already in the target
+    format and width or re-encoding would not make it smaller.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(content)) as image:
+        source_format = (image.format or "").lower()
+        if source_format == fmt and image.width <= max_width:
+            return None
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA")
+        if image.width > max_width:
+            height = max(1, round(image.height * max_width / image.width))
+            image = image.resize((max_width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, PIL_FORMATS[fmt], quality=quality)
+    data = output.getvalue()
+    return data if len(data) < len(content) else None
+
+class Transcoder:
+    """Re-encodes downloaded pages on a process pool and keeps running size and time totals."""
+    def __init__(self, fmt=None, quality=None, max_width=None, workers=None):
+        self.format = fmt or TranscodeConfig.FORMAT
+        self.quality = quality or TranscodeConfig.QUALITY
+        self.max_width = max_width or TranscodeConfig.MAX_WIDTH
+        self.extension = FORMAT_EXTENSIONS[self.format]
+        self.workers = workers or TranscodeConfig.WORKERS
+        self._executor = self._new_pool()
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.kept = 0
+        self.restarts = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def transcode(self, img_name, content):
+        """Return (img_name, content) for the page as it should be written to the CBZ."""
+        started = time.perf_counter()
+        data, failed = None, False
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                data = executor.submit(transcode_image, content, self.format, self.quality, self.max_width).result()
+                failed = False
+                break
+            except concurrent.futures.process.BrokenProcessPool as e:
+                # A worker died (killed, out of memory); later pages need a fresh pool, not silent skips.
+                print(f"Transcoder worker died ({e}); restarting the pool.")
+                self._restart_pool(executor)
+                failed = True
+            except Exception:
+                # Pillow could not read or encode this page; store it as downloaded.
+                failed = True
+                break
+        elapsed = time.perf_counter() - started
+        if data is not None:
+            img_name = os.path.splitext(img_name)[0] + self.extension
+        with self._lock:
+            self.pages += 1
+            self.kept += failed
+            self.bytes_in += len(content)
+            self.bytes_out += len(data if data is not None else content)
+            self.seconds += elapsed
+        return img_name, data if data is not None else content
+
+    def summary(self):
+        with self._lock:
+            if not self.pages:
+                return "Transcoder: no pages processed"
+            saved = 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+            return (
+                f"Transcoder ({self.format}, q{self.quality}, max width {self.max_width}): {self.pages} pages, "
+                f"{self.bytes_in / 1e6:.1f} MB -> {self.bytes_out / 1e6:.1f} MB ({saved:.0%} smaller), "
+                f"{self.seconds / self.pages * 1000:.0f} ms/page"
+                + (f", {self.kept} kept as downloaded after errors" if self.kept else "")
+                + (f", pool restarted {self.restarts} time(s)" if self.restarts else "")
+            )
+
+    def _new_pool(self):
+        # Spawned workers: forking here would copy a process full of scheduler threads and held locks.
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _restart_pool(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False)
+                self._executor = self._new_pool()
+                self.restarts += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+_TRANSCODER = None
+_TRANSCODER_LOCK = threading.Lock()
+
+def transcoder():
+    """Return the shared transcoder, or None when transcoding is off or Pillow is not installed."""
+    global _TRANSCODER
+    if not TranscodeConfig.ENABLED or not PILLOW_AVAILABLE:
+        return None
+    with _TRANSCODER_LOCK:
+        if _TRANSCODER is None:
+            _TRANSCODER = Transcoder()
+        return _TRANSCODER
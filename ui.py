@@ -1,10 +1,8 @@
 import curses
-from network import process_chapter
-from utils import top_left_menu, get_root
 
 class MenuOptions:
     def __init__(self):
-        self.options = ["Search for Manga", "Continue Reading", "Exit"]
+        self.options = ["Search for Manga", "Continue Reading", "Check for Updates", "Exit"]
 
     def display_menu(self, stdscr):
         curses.curs_set(0)
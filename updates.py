@@ -0,0 +1,93 @@
+import time
+from data import load_read_list
+from library import library_index
+from progress import progress_store
+from network import CONFIG, SCHEDULER, fetch_search_results, fetch_chapters
+from scheduler import Priority
+from chapters import chapter_number_value
+from utils import clean_filename
+
+def resolve_followed_series(series_name):
+    """Find the search result whose cleaned title is the followed series, falling back to the first hit."""
+    manga_data, error = fetch_search_results(series_name.replace('_', ' '))
+    if error:
+        return None, error
+    if not manga_data:
+        return None, "Manga not found."
+    for manga in manga_data:
+        if clean_filename(manga["title"]) == series_name:
+            return manga, None
+    return manga_data[0], None
+
+def furthest_chapter(series_name, progress):
+    numbers = list(progress["read"]) + list(library_index().chapters(series_name))
+    if progress["current"]["chapter"]:
+        numbers.append(progress["current"]["chapter"])
+    return max((chapter_number_value(number) for number in numbers), default=0)
+
+def check_series(series_name, progress):
+    """Return the chapters of one followed series that are newer than anything read or downloaded."""
+    furthest = furthest_chapter(series_name, progress)
+    series_url = progress_store().series_url(series_name)
+    if not series_url:
+        manga, error = resolve_followed_series(series_name)
+        if error:
+            return {"series": series_name, "new": [], "error": error}
+        try:
+            latest = float(manga["latest_chapter_number"])
+        except (TypeError, ValueError):
+            latest = None
+        if latest is not None and latest <= furthest:
+            return {"series": series_name, "new": [], "error": None}
+        series_url = manga["url"]
+
+    chapters, _, error = fetch_chapters(series_url, series_name)
+    if error:
+        return {"series": series_name, "new": [], "error": error}
+    new = [chapter for chapter in chapters if chapter_number_value(chapter["number"]) > furthest]
+    return {"series": series_name, "new": new, "error": None}
+
+def check_updates(read_list=None):
+    """Check every series in the read list concurrently, within the shared scheduler's per-host limit."""
+    if read_list is None:
+        read_list = load_read_list()
+    futures = [
+        SCHEDULER.submit(CONFIG.BASE_URL, check_series, series, progress, priority=Priority.BACKGROUND)
+        for series, progress in read_list.items()
+    ]
+    results = []
+    try:
+        for future, series in zip(futures, read_list):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"series": series, "new": [], "error": str(e)})
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return results
+
+def format_updates(results):
+    lines = []
+    for result in results:
+        if result["error"]:
+            lines.append(f"{result['series']}: {result['error']}")
+        elif result["new"]:
+            numbers = [chapter["number"] for chapter in result["new"]]
+            span = numbers[0] if len(numbers) == 1 else f"{numbers[0]}-{numbers[-1]}"
+            lines.append(f"{result['series']}: {len(numbers)} new chapter(s) ({span})")
+    updated = sum(1 for result in results if result["new"])
+    lines.append(f"{updated} of {len(results)} series have new chapters.")
+    return "\n".join(lines)
+
+def run_check_updates(args):
+    started = time.monotonic()
+    read_list = load_read_list()
+    if not read_list:
+        print("No manga in your read list yet.")
+        return 0
+    results = check_updates(read_list)
+    print(format_updates(results))
+    print(f"Checked {len(results)} series in {time.monotonic() - started:.1f}s")
+    return 1 if any(result["error"] for result in results) else 0
@@ -1,7 +1,6 @@
 import re
 import curses
 import time
-import tkinter as tk
 
 def clean_filename(title):
     invalid_chars = r'[<>:"/\\|?*\x00-\x1F]'
@@ -10,6 +9,12 @@ def clean_filename(title):
     title = re.sub(r'\s+', '_', title.strip())
     return title
 
+def show_status(stdscr, row, message):
+    if stdscr is None:
+        return
+    stdscr.addstr(row, 0, message)
+    stdscr.refresh()
+
 def top_left_menu(stdscr, options, prompt):
     curses.curs_set(0)
     curses.start_color()
@@ -67,5 +72,46 @@ def top_left_menu(stdscr, options, prompt):
             stdscr.keypad(False)
             return current_row
 
-def get_root():
-    return tk.Tk()
+def prompt_with_suggestions(stdscr, prompt, suggest, max_length=50):
+    """Read a line of text, listing suggest(text) below it as the user types.
+
+    Up/Down highlight a suggestion; returns (text, index of the highlighted
+    suggestion or None), or (None, None) when the prompt is cancelled with Esc.
+    """
+    curses.curs_set(1)
+    stdscr.keypad(True)
+    text = ""
+    suggestions = []
+    selected = None
+    while True:
+        stdscr.clear()
+        h, w = stdscr.getmaxyx()
+        stdscr.addnstr(0, 0, prompt, w - 1)
+        stdscr.addnstr(1, 0, text, w - 1)
+        for row, label in enumerate(suggestions[:max(0, h - 3)]):
+            stdscr.addnstr(3 + row, 0, label, w - 1, curses.A_REVERSE if row == selected else curses.A_NORMAL)
+        stdscr.move(1, min(len(text), w - 1))
+        stdscr.refresh()
+
+        key = stdscr.get_wch()
+        if key in ("\n", "\r") or key == curses.KEY_ENTER:
+            break
+        if key == "\x1b":
+            curses.curs_set(0)
+            return None, None
+        if key == curses.KEY_DOWN and suggestions:
+            selected = 0 if selected is None else min(selected + 1, len(suggestions) - 1)
+            continue
+        if key == curses.KEY_UP and selected is not None:
+            selected = selected - 1 if selected > 0 else None
+            continue
+        if key in (curses.KEY_BACKSPACE, "\b", "\x7f"):
+            text = text[:-1]
+        elif isinstance(key, str) and key.isprintable() and len(text) < max_length:
+            text += key
+        else:
+            continue
+        suggestions = suggest(text)
+        selected = None
+    curses.curs_set(0)
+    return text.strip(), selected
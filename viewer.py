@@ -1,9 +1,15 @@
+import bisect
+import itertools
+import os
 import sys
-import zipfile
+from collections import OrderedDict
 from PyQt5.QtWidgets import QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QToolBar, QAction
-from PyQt5.QtGui import QPixmap, QKeyEvent
-from PyQt5.QtCore import Qt
-from data import load_read_list, save_read_list, add_to_read_list, update_current_position, create_cbz
+from PyQt5.QtGui import QPixmap, QKeyEvent, QImage, QImageReader
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QBuffer, QByteArray, QIODevice, QRectF, QObject, QRunnable, QThreadPool
+from data import load_read_list, save_read_list, add_to_read_list, update_current_position, flush_read_list, create_cbz
+from prefetch import ChapterPrefetcher, ChapterStream, PrefetchConfig
+from archive import ARCHIVES
+import metrics
 class ViewerConfig:
     BACKGROUND_COLOR = "#2b2b2b"  
     TEXT_COLOR = "#ffffff"        
@@ -11,9 +17,66 @@ class ViewerConfig:
     SCROLL_INCREMENT = 50         
     MIN_WINDOW_SIZE = 100         
     MANHWA_AUTO_ZOOM = 5.0        
+    PAGES_BEHIND = 2
+    PAGES_AHEAD = 3
+    PIXMAP_CACHE_SIZE = 8
+    DECODE_THREADS = 2
+    DECODE_BEHIND = 2
+    DECODE_AHEAD = 6
+    DECODED_CACHE_SIZE = 10
+    HEADER_READ_SIZE = 64 * 1024
+    DEFAULT_PAGE_SIZE = (800, 1200)
+
+def image_size_from_data(data):
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.ReadOnly)
+    size = QImageReader(buffer).size()
+    return (size.width(), size.height()) if size.isValid() else None
+
+class DecodeSignals(QObject):
+    decoded = pyqtSignal(int, int, QImage)
+
+class PageDecodeTask(QRunnable):
+    """Decode one page to a QImage on a worker thread; pixmaps are made on the GUI thread.
+
+    data holds the bytes of a page that is still only in memory because its
+    chapter is streaming; other pages are read from their CBZ.
+    """
+    def __init__(self, signals, generation, index, cbz_filename, image_name, data=None):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.index = index
+        self.cbz_filename = cbz_filename
+        self.image_name = image_name
+        self.data = data
+
+    def run(self):
+        image = QImage()
+        try:
+            data = self.data if self.data is not None else ARCHIVES.read(self.cbz_filename, self.image_name)
+            with metrics.span("page.decode", bytes=len(data)):
+                image.loadFromData(data)
+        except Exception as e:
+            print(f"Error decoding image: {e}")
+        self.signals.decoded.emit(self.generation, self.index, image)
+
+def read_image_size(archive, image_name):
+    """Read a page's dimensions from its header without decoding the image."""
+    size = image_size_from_data(archive.read(image_name, ViewerConfig.HEADER_READ_SIZE))
+    if size is None:
+        size = image_size_from_data(archive.read(image_name))
+    return size or ViewerConfig.DEFAULT_PAGE_SIZE
 
 class MangaViewer(QMainWindow):
-    def __init__(self, cbz_filename, chapters, current_index, series_name, cookies, stdscr):
+    prefetch_updated = pyqtSignal(int, int, str, str)
+    stream_started = pyqtSignal(int, int)
+    stream_page = pyqtSignal(int, int, str, bytes)
+    stream_finished = pyqtSignal(int, str, str)
+
+    def __init__(self, cbz_filename, chapters, current_index, series_name, cookies, stdscr, prefetch_ahead=PrefetchConfig.CHAPTERS_AHEAD, start_page=None):
+        """Show cbz_filename, or stream chapters[current_index] while it downloads when cbz_filename is None."""
         super().__init__()
         self.setWindowTitle("Manga Viewer - PyQt5 Integration")
         self.setGeometry(100, 100, 800, 600)
@@ -26,9 +89,28 @@ class MangaViewer(QMainWindow):
         self.cbz_filename = cbz_filename
         self.current_page = 0
         self.full_size_mode = False
-        self.chapter_images = []
-        self.current_image_index = 0
+        self.pages = []
+        self.page_offsets = [0]
+        self.page_widths = []
+        self.page_items = {}
+        self.pixmap_cache = OrderedDict()
+        self.decoded_pages = OrderedDict()
+        self.decoding = set()
+        self.page_generation = 0
+        self.prefetch_generation = 0
+        self.decode_pool = QThreadPool(self)
+        self.decode_pool.setMaxThreadCount(ViewerConfig.DECODE_THREADS)
+        self.decode_signals = DecodeSignals(self)
+        self.decode_signals.decoded.connect(self.on_page_decoded)
         self.scroll_locked = False 
+        self.pending_chapter_index = None
+        self.stream_data = {}
+        self.stream_start_page = None
+        self.stream_started.connect(self.on_stream_started)
+        self.stream_page.connect(self.on_stream_page)
+        self.stream_finished.connect(self.on_stream_finished)
+        self.prefetcher = self.new_prefetcher(prefetch_ahead)
+        self.prefetch_updated.connect(self.on_prefetch_update)
         self.view = QGraphicsView(self)
         self.scene = QGraphicsScene(self)
         self.view.setScene(self.scene)
@@ -36,13 +118,150 @@ class MangaViewer(QMainWindow):
         self.view.setFocusPolicy(Qt.StrongFocus)
         self._create_actions()
         self._create_toolbar()
-        self.load_chapter(cbz_filename)
+        if cbz_filename is None:
+            self.stream_chapter(start_page)
+        else:
+            self.load_chapter(cbz_filename)
 
         self.view.setFocus()
         self.view.setStyleSheet(f"background-color: {ViewerConfig.BACKGROUND_COLOR};")
 
         self.view.verticalScrollBar().valueChanged.connect(self.check_scroll_position)
+        self.prefetcher.prefetch_from(self.current_index)
+
+    def open_series(self, cbz_filename, chapters, current_index, series_name, cookies, start_page=None):
+        """Switch the window to another chapter or series, keeping its decode pool and caches warm.
+
+        As in the constructor, a cbz_filename of None streams the chapter.
+        """
+        self.prefetcher.shutdown()
+        flush_read_list()
+        self.chapters = chapters
+        self.current_index = current_index
+        self.series_name = series_name
+        self.cookies = cookies
+        self.pending_chapter_index = None
+        self.prefetcher = self.new_prefetcher(self.prefetcher.ahead)
+        if cbz_filename is None:
+            self.stream_chapter(start_page)
+        else:
+            self.load_chapter(cbz_filename)
+        self.prefetcher.prefetch_from(self.current_index)
+
+    def new_prefetcher(self, ahead):
+        """Prefetcher for the current series whose updates are tagged so a replaced one's are ignored."""
+        self.prefetch_generation += 1
+        generation = self.prefetch_generation
+        return ChapterPrefetcher(
+            self.chapters, self.series_name, self.cookies, ahead=ahead,
+            on_update=lambda index, state, message: self.prefetch_updated.emit(generation, index, state, message),
+        )
+
+    def stream_chapter(self, start_page=None):
+        """Download the current chapter in the background and show its pages as they are written."""
+        self.clear_pages()
+        generation = self.page_generation
+        chapter = self.chapters[self.current_index]
+        self.stream_start_page = start_page
+        self.statusBar().showMessage(f"Downloading {chapter['text']}...")
+        ChapterStream(
+            chapter, self.series_name, self.cookies,
+            on_start=lambda total: self.stream_started.emit(generation, total),
+            on_page=lambda index, img_name, content: self.stream_page.emit(generation, index, img_name, content),
+            on_finish=lambda cbz_filename, message: self.stream_finished.emit(generation, cbz_filename, message),
+        ).start()
+
+    def on_stream_started(self, generation, total):
+        """Lay out placeholders for every page so the chapter can be scrolled before it arrives."""
+        if generation != self.page_generation or total == 0:
+            return
+        width, height = ViewerConfig.DEFAULT_PAGE_SIZE
+        for page_number in range(1, total + 1):
+            self.pages.append((None, None, self.current_index, page_number))
+            self.page_offsets.append(self.page_offsets[-1] + height)
+            self.page_widths.append(width)
+        self.scene.setSceneRect(QRectF(0, 0, max(self.page_widths), self.page_offsets[-1]))
+        start = min(max((self.stream_start_page or 1) - 1, 0), total - 1)
+        self.scroll_to_page(start)
+        self.update_visible_pages()
+        self.scroll_locked = False
+
+    def on_stream_page(self, generation, index, img_name, content):
+        if generation != self.page_generation:
+            return
+        _, _, chapter_index, page_number = self.pages[index]
+        self.pages[index] = (None, img_name, chapter_index, page_number)
+        first_page = not self.stream_data
+        self.stream_data[index] = content
+        size = image_size_from_data(content) or ViewerConfig.DEFAULT_PAGE_SIZE
+        if first_page:
+            # Most chapters use one page size, so the first page is a better guess than the default.
+            self.resize_pages({i: size for i, page in enumerate(self.pages) if page[0] is None})
+        else:
+            self.resize_pages({index: size})
+        self.update_visible_pages()
+
+    def on_stream_finished(self, generation, cbz_filename, message):
+        """Point streamed pages at the finished CBZ, or open it directly if it was already on disk."""
+        if generation != self.page_generation:
+            return
+        chapter = self.chapters[self.current_index]
+        if not cbz_filename:
+            self.statusBar().showMessage(f"{chapter['text']}: {message}")
+            return
+        if not self.pages:
+            # Already on disk, so nothing streamed; open it at the saved page like a normal open.
+            self.load_chapter(cbz_filename)
+            self.show_page_number(self.stream_start_page)
+            return
+        self.pages = [(cbz_filename if page[0] is None and page[1] else page[0], *page[1:]) for page in self.pages]
+        self.stream_data.clear()
+        self.cbz_file = cbz_filename
+        self.statusBar().showMessage(f"{chapter['text']} saved", 3000)
+
+    def resize_pages(self, sizes):
+        """Give pages their real (width, height), keeping the page in view where it was."""
+        heights = [bottom - top for top, bottom in zip(self.page_offsets, self.page_offsets[1:])]
+        shift = 0
+        for index, (width, height) in sizes.items():
+            if index < self.current_page:
+                shift += height - heights[index]
+            heights[index] = height
+            self.page_widths[index] = width
+        self.page_offsets = list(itertools.accumulate(heights, initial=0))
+        for index, item in self.page_items.items():
+            item.setPos(0, self.page_offsets[index])
+        self.scene.setSceneRect(QRectF(0, 0, max(self.page_widths), self.page_offsets[-1]))
+        if shift:
+            scroll_bar = self.view.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.value() + int(shift * self.view.transform().m22()))
+
+    def on_prefetch_update(self, generation, index, state, message):
+        """Show prefetch progress and switch chapters once a chapter the reader is waiting on lands."""
+        if generation != self.prefetch_generation:
+            return
+        self.statusBar().showMessage(message, 0 if state == "downloading" else 3000)
+        if index != self.pending_chapter_index:
+            return
+        if state == "ready":
+            self.pending_chapter_index = None
+            self.advance_to_chapter(index)
+        elif state == "failed":
+            self.pending_chapter_index = None
+            self.scroll_locked = False
+
+    def closeEvent(self, event):
+        self.prefetcher.shutdown()
+        self.decode_pool.clear()
+        flush_read_list()
+        super().closeEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_visible_pages()
+
     def check_scroll_position(self):
+        self.update_visible_pages()
         vertical_scroll_bar = self.view.verticalScrollBar()
         max_value = vertical_scroll_bar.maximum()
         current_value = vertical_scroll_bar.value()
@@ -50,7 +269,7 @@ class MangaViewer(QMainWindow):
 
         if current_value >= threshold and not self.scroll_locked:
             self.scroll_locked = True
-            self.next_page()
+            self.next_chapter()
 
     def _create_actions(self):
         self.toggle_action = QAction("Toggle Full-Size", self)
@@ -61,8 +280,9 @@ class MangaViewer(QMainWindow):
         self.addToolBar(toolbar)
         toolbar.addAction(self.toggle_action)
 
+    @metrics.timed("viewer.load_chapter")
     def load_chapter(self, chapter_info, append=False):
-        """Load chapter images and optionally append to the current scene."""
+        """Index a chapter's pages and optionally append them below the pages already loaded."""
         if isinstance(chapter_info, dict):
             cbz_filename = chapter_info.get("cbz_filename")
         else:
@@ -73,51 +293,134 @@ class MangaViewer(QMainWindow):
             return
 
         try:
-            with zipfile.ZipFile(cbz_filename, 'r') as zf:
-                images = sorted(
-                    [f for f in zf.namelist() if f.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp'))]
-                )
-
-                if not append:
-                    self.scene.clear()
-                    self.current_image_index = 0
-                else:
-                    self.current_image_index = 0 
-
-                self.chapter_images = images
-                self.cbz_file = cbz_filename
-                self.display_image_from_cbz(append=append)
-
+            with ARCHIVES.open(cbz_filename) as archive:
+                images = list(archive.pages)
+                sizes = [read_image_size(archive, image_name) for image_name in images]
         except Exception as e:
             print(f"Failed to load chapter: {e}")
+            return
 
-    def display_image_from_cbz(self, append=False):
-        if not self.chapter_images:
+        if not images:
             print("No images found in chapter.")
             return
 
-        try:
-            with zipfile.ZipFile(self.cbz_file, 'r') as zf:
-                while self.current_image_index < len(self.chapter_images):
-                    image_name = self.chapter_images[self.current_image_index]
-                    with zf.open(image_name) as file:
-                        image_data = file.read()
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(image_data)
-                    y_offset = self.scene.itemsBoundingRect().bottom() if self.scene.items() else 0
-                    item = QGraphicsPixmapItem(pixmap)
-                    item.setPos(0, y_offset)
-                    self.scene.addItem(item)
-
-                    self.current_image_index += 1
-
-                    if not append:
-                        break 
+        if not append:
+            self.clear_pages()
 
-            self.scroll_locked = False
+        for page_number, (image_name, (width, height)) in enumerate(zip(images, sizes), start=1):
+            self.pages.append((cbz_filename, image_name, self.current_index, page_number))
+            self.page_offsets.append(self.page_offsets[-1] + height)
+            self.page_widths.append(width)
 
-        except Exception as e:
-            print(f"Error displaying image: {e}")
+        self.cbz_file = cbz_filename
+        self.scene.setSceneRect(QRectF(0, 0, max(self.page_widths), self.page_offsets[-1]))
+        if not append:
+            self.request_decode(0, ViewerConfig.DECODE_AHEAD * 2)
+            self.scroll_to_page(0)
+        self.update_visible_pages()
+        self.scroll_locked = False
+
+    def clear_pages(self):
+        self.scene.clear()
+        self.pages = []
+        self.page_offsets = [0]
+        self.page_widths = []
+        self.page_items = {}
+        self.pixmap_cache.clear()
+        self.decoded_pages.clear()
+        self.decoding.clear()
+        self.stream_data.clear()
+        self.decode_pool.clear()
+        self.page_generation += 1
+        self.current_page = 0
+
+    def page_at(self, y):
+        return min(max(bisect.bisect_right(self.page_offsets, y) - 1, 0), len(self.pages) - 1)
+
+    def update_visible_pages(self):
+        """Keep pixmaps only for the pages around the viewport."""
+        if not self.pages:
+            return
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        first = self.page_at(visible.top())
+        last = self.page_at(visible.bottom())
+        start = max(first - ViewerConfig.PAGES_BEHIND, 0)
+        end = min(last + ViewerConfig.PAGES_AHEAD, len(self.pages) - 1)
+
+        for index in [index for index in self.page_items if index < start or index > end]:
+            self.release_page(index)
+        for index in range(start, end + 1):
+            if index not in self.page_items:
+                self.show_page(index)
+        for index in range(max(first - ViewerConfig.DECODE_BEHIND, 0), min(last + ViewerConfig.DECODE_AHEAD, len(self.pages) - 1) + 1):
+            distance = 0 if first <= index <= last else abs(index - first)
+            self.request_decode(index, ViewerConfig.DECODE_AHEAD * 2 - distance)
+
+        if first != self.current_page:
+            self.current_page = first
+            self.record_position()
+
+    def show_page(self, index):
+        pixmap = self.pixmap_cache.pop(index, None)
+        if pixmap is None and index in self.decoded_pages:
+            with metrics.span("pixmap.convert"):
+                pixmap = QPixmap.fromImage(self.decoded_pages.pop(index))
+        with metrics.span("scene.insert"):
+            item = QGraphicsPixmapItem(pixmap or QPixmap())
+            item.setPos(0, self.page_offsets[index])
+            self.scene.addItem(item)
+        self.page_items[index] = item
+
+    def release_page(self, index):
+        item = self.page_items.pop(index)
+        self.scene.removeItem(item)
+        if item.pixmap().isNull():
+            return
+        self.pixmap_cache[index] = item.pixmap()
+        while len(self.pixmap_cache) > ViewerConfig.PIXMAP_CACHE_SIZE:
+            self.pixmap_cache.popitem(last=False)
+
+    def request_decode(self, index, priority):
+        item = self.page_items.get(index)
+        if index in self.decoding or index in self.decoded_pages or index in self.pixmap_cache:
+            return
+        if item is not None and not item.pixmap().isNull():
+            return
+        cbz_filename, image_name, _, _ = self.pages[index]
+        data = self.stream_data.get(index)
+        if cbz_filename is None and data is None:
+            return
+        self.decoding.add(index)
+        task = PageDecodeTask(self.decode_signals, self.page_generation, index, cbz_filename, image_name, data)
+        self.decode_pool.start(task, priority)
+
+    def on_page_decoded(self, generation, index, image):
+        if generation != self.page_generation:
+            return
+        self.decoding.discard(index)
+        item = self.page_items.get(index)
+        if item is not None:
+            with metrics.span("pixmap.convert"):
+                item.setPixmap(QPixmap.fromImage(image))
+            return
+        self.decoded_pages[index] = image
+        while len(self.decoded_pages) > ViewerConfig.DECODED_CACHE_SIZE:
+            self.decoded_pages.popitem(last=False)
+
+    def record_position(self):
+        if self.series_name is None:
+            return
+        _, _, chapter_index, page_number = self.pages[self.current_page]
+        update_current_position(self.series_name, self.chapters[chapter_index]["number"], page_number)
+
+    def show_page_number(self, page_number):
+        """Scroll to a 1-based page on the next event loop pass, once the window has its final size."""
+        if page_number and self.pages:
+            QTimer.singleShot(0, lambda: self.pages and self.scroll_to_page(min(max(int(page_number), 1), len(self.pages)) - 1))
+
+    def scroll_to_page(self, index):
+        scale = self.view.transform().m22()
+        self.view.verticalScrollBar().setValue(int(self.page_offsets[index] * scale))
 
     def load_cbz_image(self, filename):
         """Extract and load the first image from a CBZ file."""
@@ -125,21 +428,20 @@ class MangaViewer(QMainWindow):
             if not filename or isinstance(filename, dict):
                 raise ValueError("Invalid file type: Expected a file path, got None or dict.")
             
-            with zipfile.ZipFile(filename, 'r') as zf:
-                image_files = [f for f in zf.namelist() if f.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp'))]
-                if not image_files:
+            with ARCHIVES.open(filename) as archive:
+                if not archive.pages:
                     return None
-                image_files.sort()
-                with zf.open(image_files[0]) as file:
-                    data = file.read()
-                    return data
+                return archive.read_page(0)
         except Exception as e:
             print(f"Error reading CBZ file: {e}")
             return None
 
     def fitInView(self):
         """Fit the image into the window."""
-        rect = self.pixmap_item.boundingRect()
+        if not self.pages:
+            return
+        index = self.current_page
+        rect = QRectF(0, self.page_offsets[index], self.page_widths[index], self.page_offsets[index + 1] - self.page_offsets[index])
         self.view.fitInView(rect, Qt.KeepAspectRatio)
 
     def toggle_full_size(self):
@@ -165,38 +467,47 @@ class MangaViewer(QMainWindow):
             super().keyPressEvent(event)
 
     def next_page(self):
-        if self.current_image_index < len(self.chapter_images):
-            self.view.verticalScrollBar().valueChanged.disconnect(self.check_scroll_position)
-            self.display_image_from_cbz()  
-            self.view.verticalScrollBar().valueChanged.connect(self.check_scroll_position)
-            current_chapter = self.chapters[self.current_index]["number"]
-            new_page = self.current_image_index + 1  
-            update_current_position(self.series_name, current_chapter, new_page)
+        if self.current_page < len(self.pages) - 1:
+            self.scroll_to_page(self.current_page + 1)
         else:
-            if self.current_index < len(self.chapters) - 1:
-                current_chapter = self.chapters[self.current_index]["number"]
-                add_to_read_list(self.series_name, current_chapter)
-                self.current_index += 1
-                next_chapter = self.chapters[self.current_index]
-                self.load_chapter(next_chapter, append=True)
-                update_current_position(self.series_name, next_chapter["number"], 1)
+            self.next_chapter()
+
+    def next_chapter(self):
+        if self.current_index < len(self.chapters) - 1:
+            next_index = self.current_index + 1
+            cbz_filename = self.chapters[next_index].get("cbz_filename")
+            if self.prefetcher.is_ready(next_index) or (cbz_filename and os.path.exists(cbz_filename)):
+                self.advance_to_chapter(next_index)
             else:
-                print("No more chapters available.")
+                self.pending_chapter_index = next_index
+                self.prefetcher.request(next_index)
+                self.statusBar().showMessage(f"Waiting for {self.chapters[next_index]['text']}...")
+        else:
+            print("No more chapters available.")
+
+    def advance_to_chapter(self, index):
+        current_chapter = self.chapters[self.current_index]["number"]
+        add_to_read_list(self.series_name, current_chapter)
+        self.current_index = index
+        next_chapter = self.chapters[self.current_index]
+        self.load_chapter(next_chapter, append=True)
+        update_current_position(self.series_name, next_chapter["number"], 1)
+        self.prefetcher.prefetch_from(self.current_index)
 
 
 
     def prev_page(self):
-        if self.current_image_index > 0:
-            self.view.verticalScrollBar().valueChanged.disconnect(self.check_scroll_position)
-            self.current_image_index -= 1
-            self.display_image_from_cbz()
-            self.view.verticalScrollBar().valueChanged.connect(self.check_scroll_position)
-            current_chapter = self.chapters[self.current_index]["number"]
-            new_page = self.current_image_index + 1  
-            update_current_position(self.series_name, current_chapter, new_page)
+        if not self.pages:
+            return
+        visible_top = self.view.mapToScene(self.view.viewport().rect()).boundingRect().top()
+        if visible_top > self.page_offsets[self.current_page] + 1:
+            self.scroll_to_page(self.current_page)
+        elif self.current_page > 0:
+            self.scroll_to_page(self.current_page - 1)
         else:
-            if self.current_index > 0:
-                self.current_index -= 1
+            first_chapter = self.pages[0][2]
+            if first_chapter > 0:
+                self.current_index = first_chapter - 1
                 prev_chapter = self.chapters[self.current_index]
                 self.load_chapter(prev_chapter) 
                 update_current_position(self.series_name, prev_chapter["number"], 1)
@@ -210,3 +521,65 @@ class MangaViewer(QMainWindow):
     def scroll_down(self):
         """Scroll down the current page."""
         self.view.verticalScrollBar().setValue(self.view.verticalScrollBar().value() + ViewerConfig.SCROLL_INCREMENT)
+
+class ViewerHost(QObject):
+    """GUI-thread side of the viewer service: owns the one viewer window and runs commands sent to it."""
+    command_received = pyqtSignal(dict, object)
+    quit_requested = pyqtSignal()
+
+    def __init__(self, reply, config=None):
+        super().__init__()
+        self.reply = reply
+        self.config = config or {}
+        self.viewer = None
+        self.command_received.connect(self.on_command)
+
+    def on_command(self, command, conn):
+        try:
+            result = self.handle(command)
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        self.reply(conn, **result)
+        if command.get("command") == "quit":
+            self.quit_requested.emit()
+
+    def handle(self, command):
+        name = command.get("command")
+        if name == "ping":
+            return {"ok": True, "config": self.config}
+        if name == "quit":
+            return {"ok": True}
+        if name == "open":
+            self.open(command)
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command: {name}"}
+
+    def open(self, command):
+        """Show a CBZ, or stream chapters[current_index] while it downloads when cbz_filename is None."""
+        cbz_filename = command.get("cbz_filename")
+        chapters = command.get("chapters")
+        if cbz_filename is None:
+            if not chapters:
+                raise ValueError("Streaming needs the chapter list")
+        elif not os.path.exists(cbz_filename):
+            raise FileNotFoundError(f"No such file: {cbz_filename}")
+        chapters = chapters or [{"text": os.path.basename(cbz_filename), "url": None, "number": None, "cbz_filename": cbz_filename}]
+        current_index = command.get("current_index", 0)
+        series_name = command.get("series_name")
+        cookies = command.get("cookies") or {}
+        page = command.get("page")
+        if self.viewer is None:
+            self.viewer = MangaViewer(cbz_filename, chapters, current_index, series_name, cookies, None, start_page=page)
+        else:
+            self.viewer.open_series(cbz_filename, chapters, current_index, series_name, cookies, start_page=page)
+        self.viewer.showMaximized()
+        self.viewer.raise_()
+        self.viewer.activateWindow()
+        if cbz_filename is not None:
+            self.viewer.show_page_number(page)
+
+    def shutdown(self):
+        if self.viewer is not None:
+            self.viewer.close()
+        ARCHIVES.close_all()
+        flush_read_list()
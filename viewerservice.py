@@ -0,0 +1,236 @@
+import getpass
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+
+class ViewerServiceConfig:
+    RUNTIME_DIR = os.path.join(tempfile.gettempdir(), f"mangareader-{getpass.getuser()}")
+    START_TIMEOUT = 20.0
+    COMMAND_TIMEOUT = 5.0
+    POLL_INTERVAL = 0.1
+    # Top-level mangareader options (library, transcoding, pool size) a spawned service should inherit.
+    SERVICE_ARGS = []
+
+# What a client sees when no service, a dead one, or a restarted one with a new key is at the endpoint.
+SERVICE_ERRORS = (OSError, EOFError, AuthenticationError)
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mangareader.py")
+
+# Set once this process has started a service, so it can stop that one again on exit.
+_STARTED = False
+
+def service_address():
+    """Address to listen on: a socket in the private runtime directory, or any free loopback port on Windows."""
+    if sys.platform == "win32":
+        return ("127.0.0.1", 0)
+    return os.path.join(ViewerServiceConfig.RUNTIME_DIR, "viewer.sock")
+
+def endpoint_path():
+    return os.path.join(ViewerServiceConfig.RUNTIME_DIR, "viewer.json")
+
+def write_endpoint(address, authkey):
+    """Publish the bound address and this run's random authkey to a file only the current user can read."""
+    path = endpoint_path()
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"address": address, "authkey": authkey.hex()}, f)
+    os.replace(temp_path, path)
+
+def read_endpoint():
+    """Return (address, authkey) of the running service; raises OSError when there is none."""
+    try:
+        with open(endpoint_path(), "r") as f:
+            endpoint = json.load(f)
+        address = endpoint["address"]
+        return tuple(address) if isinstance(address, list) else address, bytes.fromhex(endpoint["authkey"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise FileNotFoundError(f"Unreadable viewer endpoint file: {e}")
+
+def runtime_dir():
+    path = ViewerServiceConfig.RUNTIME_DIR
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid") and os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user")
+    return path
+
+def send_command(command):
+    """Send one JSON command to a running service and return its reply; raises OSError if none is listening."""
+    address, authkey = read_endpoint()
+    with Client(address, authkey=authkey) as conn:
+        conn.send_bytes(json.dumps(command).encode("utf-8"))
+        return json.loads(conn.recv_bytes())
+
+def service_config():
+    """What a service must share with this process: the directory its relative paths resolve in, and its options.
+
+    Reading progress, the catalog and the HTTP cache live at paths relative to
+    the working directory, and the library and transcoding options are fixed
+    when the service starts, so a service that differs in either is restarted.
+    """
+    return {"cwd": os.getcwd(), "args": list(ViewerServiceConfig.SERVICE_ARGS)}
+
+def running_config():
+    """Return the service_config() of the running service, or None when none is answering."""
+    try:
+        reply = send_command({"command": "ping"})
+    except SERVICE_ERRORS:
+        return None
+    return reply.get("config", {}) if reply.get("ok") else None
+
+def is_running():
+    return running_config() is not None
+
+def wait_for(condition, process=None):
+    """Poll condition until it holds or START_TIMEOUT passes; gives up early if process exits."""
+    deadline = time.monotonic() + ViewerServiceConfig.START_TIMEOUT
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        if process is not None and process.poll() is not None:
+            return False
+        time.sleep(ViewerServiceConfig.POLL_INTERVAL)
+    return False
+
+def start_service():
+    """Start a detached viewer service unless one with this process's config is answering, and wait until it does."""
+    global _STARTED
+    config = running_config()
+    if config == service_config():
+        return True
+    if config is not None:
+        stop_service()
+        if not wait_for(lambda: not is_running()):
+            return False
+    log_path = os.path.join(runtime_dir(), "viewer.log")
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, SCRIPT, *ViewerServiceConfig.SERVICE_ARGS, "viewer"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        )
+    _STARTED = True
+    return wait_for(is_running, process)
+
+def open_in_viewer(cbz_filename, chapters, current_index, series_name, cookies, page=None):
+    """Show a chapter in the shared viewer window, starting the service if needed; returns an error or None.
+
+    With cbz_filename None the service downloads chapters[current_index] itself
+    and shows each page as it lands.
+    """
+    if not start_service():
+        return f"Viewer service did not start; see {os.path.join(ViewerServiceConfig.RUNTIME_DIR, 'viewer.log')}"
+    command = {
+        "command": "open",
+        "cbz_filename": cbz_filename and os.path.abspath(cbz_filename),
+        "chapters": chapters,
+        "current_index": current_index,
+        "series_name": series_name,
+        "cookies": dict(cookies or {}),
+        "page": page,
+    }
+    try:
+        reply = send_command(command)
+    except SERVICE_ERRORS as e:
+        return f"Viewer service unavailable: {e}"
+    return None if reply.get("ok") else reply.get("error", "Viewer refused the request")
+
+def stop_service():
+    try:
+        send_command({"command": "quit"})
+    except SERVICE_ERRORS:
+        return False
+    return True
+
+def stop_started_service():
+    """Stop the service if this process started it, e.g. when the menu exits."""
+    global _STARTED
+    if _STARTED:
+        _STARTED = False
+        stop_service()
+
+def accept_commands(listener, authkey, on_command):
+    """Listener thread: accept connections until the listener closes, each handled on its own thread.
+
+    The listener itself has no authkey, so a client that stalls during the
+    handshake or before sending its command only holds up its own thread.
+    """
+    while True:
+        try:
+            conn = listener.accept()
+        except OSError:
+            return
+        threading.Thread(target=read_command, args=(conn, authkey, on_command), daemon=True, name="viewer-client").start()
+
+def read_command(conn, authkey, on_command):
+    try:
+        deliver_challenge(conn, authkey)
+        answer_challenge(conn, authkey)
+        if not conn.poll(ViewerServiceConfig.COMMAND_TIMEOUT):
+            raise TimeoutError("no command received")
+        command = json.loads(conn.recv_bytes())
+    except Exception as e:
+        print(f"Rejected viewer client: {e}")
+        conn.close()
+        return
+    on_command(command, conn)
+
+def reply(conn, **message):
+    try:
+        conn.send_bytes(json.dumps(message).encode("utf-8"))
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+def serve():
+    """Run the viewer service in this process: one QApplication that outlives its windows."""
+    if is_running():
+        print("A viewer service is already running.")
+        return 0
+    runtime_dir()
+    address = service_address()
+    if isinstance(address, str) and os.path.exists(address):
+        os.unlink(address)
+
+    from PyQt5.QtWidgets import QApplication
+    from viewer import ViewerHost
+
+    app = QApplication(sys.argv[:1])
+    app.setQuitOnLastWindowClosed(False)
+    authkey = secrets.token_bytes(32)
+    listener = Listener(address)
+    write_endpoint(listener.address, authkey)
+    host = ViewerHost(reply, service_config())
+    host.quit_requested.connect(app.quit)
+    threading.Thread(target=accept_commands, args=(listener, authkey, host.command_received.emit), daemon=True, name="viewer-service").start()
+    try:
+        return app.exec_()
+    finally:
+        listener.close()
+        try:
+            os.remove(endpoint_path())
+        except FileNotFoundError:
+            pass
+        host.shutdown()
+
+def run_viewer(args):
+    if args.stop:
+        if not stop_service():
+            print("No viewer service is running.")
+            return 1
+        return 0
+    return serve()
+
+def run_view(args):
+    error = open_in_viewer(args.cbz, [], 0, None, None, args.page)
+    if error:
+        print(error)
+        return 1
+    return 0